@@ -0,0 +1 @@
+"""Shared computation helpers for the OptimEdu Streamlit pages."""
@@ -0,0 +1,106 @@
+"""Adaptive-precision Monte Carlo for the investment forecaster.
+
+Paths are added in independent batches until the 95% confidence half-widths
+of the percentile bands and of the probability of reaching the target fall
+below the requested tolerances. Each batch is a separate replicate (its own
+seed, and its own scramble for Sobol sampling), so the spread of the batch
+estimates gives the error estimate. The coverage probability is corrected
+with the final portfolio value as a control variate, whose mean is known in
+closed form.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from optimedu.correlated import expected_portfolio_growth, portfolio_inputs, simulate_portfolio_growth
+from optimedu.portfolio import portfolio_moments
+from optimedu.simulation import DEFAULT_PERCENTILES, DEFAULT_SEED, SimulationSummary, expected_growth, simulate_growth
+
+CONFIDENCE_Z = 1.96
+
+
+@dataclass
+class AdaptiveSimulation:
+    """Summary of an adaptive run plus the precision it reached."""
+
+    summary: SimulationSummary
+    coverage_probability: float
+    probability_half_width: float
+    band_half_width: float
+    converged: bool
+
+
+def control_variate_mean(values, control, control_mean):
+    """Mean of ``values`` corrected by a ``control`` sample with known mean."""
+    control_variance = control.var()
+    if control_variance == 0:
+        return float(values.mean())
+    beta = np.mean((values - values.mean()) * (control - control.mean())) / control_variance
+    return float(values.mean() - beta * (control.mean() - control_mean))
+
+
+def run_adaptive_simulation(initial_value, weights, target, correlated=True, months=12, method="antithetic",
+                            band_tolerance=0.005, probability_tolerance=0.005, batch_size=4096, min_batches=4,
+                            max_simulations=1_048_576, seed=DEFAULT_SEED, percentiles=DEFAULT_PERCENTILES):
+    """Simulate until the bands and the probability of reaching ``target`` are precise.
+
+    ``band_tolerance`` bounds the half-width of every band value relative to
+    the value itself; ``probability_tolerance`` is an absolute bound on the
+    coverage probability. Stops at ``max_simulations`` paths regardless.
+    """
+    if correlated:
+        fractions, returns, covariance = portfolio_inputs(weights)
+        cholesky = np.linalg.cholesky(covariance)
+        mean_growth = expected_portfolio_growth(months, fractions, returns)
+
+        def simulate(rng):
+            return simulate_portfolio_growth(rng, batch_size, months, fractions, returns, cholesky, method)
+    else:
+        expected_return, expected_volatility = portfolio_moments(weights)
+        mean_growth = expected_growth(months, expected_return)
+
+        def simulate(rng):
+            return simulate_growth(rng, batch_size, months, expected_return, expected_volatility, method)
+
+    threshold = target / initial_value
+    seed_sequence = np.random.SeedSequence(seed)
+    band_estimates, probability_estimates, final_growth = [], [], []
+
+    while True:
+        growth = simulate(np.random.default_rng(seed_sequence.spawn(1)[0]))
+        final = growth[:, -1]
+        band_estimates.append(np.percentile(growth, [percentiles[0], 50, percentiles[1]], axis=0))
+        probability_estimates.append(control_variate_mean((final >= threshold).astype(float), final, mean_growth))
+        final_growth.append(final)
+
+        batches = len(band_estimates)
+        if batches < min_batches:
+            continue
+
+        bands = np.array(band_estimates)
+        band_half_width = float(np.max(
+            CONFIDENCE_Z * bands.std(axis=0, ddof=1) / np.sqrt(batches) / bands.mean(axis=0)
+        ))
+        probability_half_width = float(
+            CONFIDENCE_Z * np.std(probability_estimates, ddof=1) / np.sqrt(batches)
+        )
+        converged = band_half_width <= band_tolerance and probability_half_width <= probability_tolerance
+        if converged or batches * batch_size >= max_simulations:
+            break
+
+    lower, median, upper = np.concatenate([np.ones((3, 1)), bands.mean(axis=0)], axis=1) * initial_value
+    summary = SimulationSummary(
+        median=median,
+        lower=lower,
+        upper=upper,
+        final_values=np.concatenate(final_growth) * initial_value,
+        num_simulations=batches * batch_size,
+    )
+    return AdaptiveSimulation(
+        summary=summary,
+        coverage_probability=min(max(float(np.mean(probability_estimates)), 0.0), 1.0),
+        probability_half_width=probability_half_width,
+        band_half_width=band_half_width,
+        converged=converged,
+    )
@@ -0,0 +1,110 @@
+"""Batched search over asset allocations for the investment forecaster.
+
+Every candidate weight vector is scored against the same matrix of standard
+normal draws (common random numbers), so differences between candidates come
+from the allocation and not from sampling noise. With ``correlated=True``
+the draws are per-asset growth paths from
+:func:`optimedu.correlated.simulate_asset_growth`, the model the page's
+correlated simulation uses; otherwise each candidate is a single asset whose
+volatility is the weighted sum of the asset volatilities.
+"""
+
+from dataclasses import dataclass
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from optimedu.correlated import simulate_asset_growth
+from optimedu.portfolio import ASSET_CORRELATION, ASSET_DATA, covariance_matrix
+from optimedu.simulation import DEFAULT_SEED
+
+MAX_BATCH_ELEMENTS = 4_000_000
+
+
+@dataclass
+class AllocationSearch:
+    """Scored candidates, the cheapest one and the return/volatility frontier.
+
+    ``candidates`` has one percentage column per asset plus
+    ``expected_return``, ``expected_volatility`` and ``required_investment``;
+    ``best`` is its row with the smallest ``required_investment``.
+    """
+
+    candidates: pd.DataFrame
+    best: pd.Series
+    frontier: pd.DataFrame
+    assets: tuple
+    coverage: float
+
+
+def candidate_weights(num_assets, step=5):
+    """All percentage weight vectors in multiples of ``step`` that sum to 100."""
+    units = 100 // step
+    rows = []
+    # Stars and bars: choose where the num_assets - 1 dividers go among the units.
+    for dividers in combinations(range(units + num_assets - 1), num_assets - 1):
+        bounds = (-1,) + dividers + (units + num_assets - 1,)
+        rows.append([bounds[i + 1] - bounds[i] - 1 for i in range(num_assets)])
+    return np.array(rows, dtype=float) * step
+
+
+def efficient_frontier(candidates):
+    """Candidates not beaten on return by any allocation with lower volatility."""
+    ordered = candidates.sort_values(["expected_volatility", "expected_return"], ascending=[True, False])
+    best_so_far = ordered["expected_return"].cummax().shift(fill_value=-np.inf)
+    return ordered[ordered["expected_return"] > best_so_far]
+
+
+def find_allocation(deficit, assets, coverage=0.9, months=12, num_simulations=2000, step=5,
+                    seed=DEFAULT_SEED, correlated=False, asset_data=ASSET_DATA, correlation=ASSET_CORRELATION):
+    """Smallest investment in ``assets`` that reaches ``deficit`` with probability ``coverage``.
+
+    For each candidate the simulated 12-month growth factors ``G`` give the
+    required investment ``deficit / quantile(G, 1 - coverage)``.
+    """
+    weights = candidate_weights(len(assets), step)
+    fractions = weights / 100
+    returns = np.array([asset_data[asset]["return"] for asset in assets])
+    expected_return = fractions @ returns
+    rng = np.random.default_rng(seed)
+
+    if correlated:
+        covariance = covariance_matrix(list(assets), asset_data, correlation)
+        expected_volatility = np.sqrt(np.einsum("ci,ij,cj->c", fractions, covariance, fractions))
+        # Buy and hold: a candidate's growth is its weights times the final growth of each asset.
+        asset_growth = simulate_asset_growth(rng, num_simulations, months, returns, np.linalg.cholesky(covariance))[:, -1]
+
+        def growth_of(rows):
+            return fractions[rows] @ asset_growth.T
+    else:
+        volatilities = np.array([asset_data[asset]["volatility"] for asset in assets])
+        expected_volatility = fractions @ volatilities
+        normals = rng.standard_normal((num_simulations, months))
+        monthly_mean = expected_return / 12
+        monthly_sd = expected_volatility / np.sqrt(12)
+
+        def growth_of(rows):
+            return (1 + monthly_mean[rows, None, None] + monthly_sd[rows, None, None] * normals).prod(axis=2)
+
+    growth_quantile = np.empty(len(weights))
+    batch = max(1, MAX_BATCH_ELEMENTS // (num_simulations * months))
+    for start in range(0, len(weights), batch):
+        rows = slice(start, start + batch)
+        growth_quantile[rows] = np.quantile(growth_of(rows), 1 - coverage, axis=1)
+
+    with np.errstate(divide="ignore"):
+        required = np.where(growth_quantile > 0, deficit / growth_quantile, np.inf)
+
+    candidates = pd.DataFrame(weights, columns=list(assets))
+    candidates["expected_return"] = expected_return
+    candidates["expected_volatility"] = expected_volatility
+    candidates["required_investment"] = required
+
+    return AllocationSearch(
+        candidates=candidates,
+        best=candidates.loc[candidates["required_investment"].idxmin()],
+        frontier=efficient_frontier(candidates),
+        assets=tuple(assets),
+        coverage=coverage,
+    )
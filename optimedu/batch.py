@@ -0,0 +1,76 @@
+"""Enrollment and budget-deficit forecasts for every county in a dataset.
+
+The county series are fitted with :func:`optimedu.holt.fit_holt` in chunks,
+spread over a process pool when there are enough counties to pay for it.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from optimedu.holt import fit_holt
+
+ENROLLMENT_COLUMN = "enrollment"
+BUDGET_COLUMN = "total_budget"
+COUNTIES_PER_TASK = 64
+
+
+def _fit_chunk(series):
+    """Fit every ``(county, counts)`` pair; fewer than two years gives no forecast."""
+    rows = []
+    for county, counts in series:
+        if len(counts) < 2:
+            rows.append((county, np.nan, np.nan, np.nan))
+            continue
+        fit = fit_holt(counts)
+        rows.append((county, fit.forecast(1)[0], fit.alpha, fit.beta))
+    return rows
+
+
+def forecast_counties(df, goal_per_student, workers=None):
+    """Forecast next year's enrollment and budget deficit for every county.
+
+    ``df`` needs ``county``, ``year`` and ``enrollment`` columns. The current
+    budget is the latest year's ``total_budget`` when that column exists and
+    ``spending_per_student * enrollment`` otherwise. When a county-year
+    appears more than once, its last row in the file is used. Returns one
+    row per county.
+    """
+    data = (
+        df.dropna(subset=[ENROLLMENT_COLUMN])
+        .sort_values(["county", "year"], kind="stable")
+        .drop_duplicates(["county", "year"], keep="last")
+    )
+    series = [(county, group[ENROLLMENT_COLUMN].to_numpy(dtype=float))
+              for county, group in data.groupby("county", sort=False)]
+    chunks = [series[i:i + COUNTIES_PER_TASK] for i in range(0, len(series), COUNTIES_PER_TASK)]
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            fitted = [row for rows in executor.map(_fit_chunk, chunks) for row in rows]
+    else:
+        fitted = [row for chunk in chunks for row in _fit_chunk(chunk)]
+
+    result = pd.DataFrame(fitted, columns=["county", "forecast", "alpha", "beta"])
+    latest = data.groupby("county", sort=False).tail(1).set_index("county")
+    result = result.join(latest[["year", ENROLLMENT_COLUMN]], on="county")
+    result = result.rename(columns={"year": "latest_year", ENROLLMENT_COLUMN: "latest_enrollment"})
+
+    if BUDGET_COLUMN in latest.columns:
+        current_budget = latest[BUDGET_COLUMN]
+    elif "spending_per_student" in latest.columns:
+        current_budget = latest["spending_per_student"] * latest[ENROLLMENT_COLUMN]
+    else:
+        current_budget = pd.Series(np.nan, index=latest.index)
+
+    result["next_year_students"] = np.floor(result["forecast"]).astype("Int64")
+    result["current_budget"] = result["county"].map(current_budget)
+    result["required_budget"] = result["next_year_students"] * goal_per_student
+    result["deficit"] = result["required_budget"] - result["current_budget"]
+    return result[[
+        "county", "latest_year", "latest_enrollment", "next_year_students",
+        "current_budget", "required_budget", "deficit", "alpha", "beta",
+    ]]
@@ -0,0 +1,154 @@
+"""Cluster bootstrap for the Impact Analyzer's regressions.
+
+Counties are resampled with replacement, keeping all of a county's years
+together. The model's cross-products ``Z'Z`` and ``Z'Y`` are computed once
+per county, so a replicate is a weighted sum of those per-county matrices
+with the number of times each county was drawn as the weights. Whole
+batches of replicates are then solved with one batched ``np.linalg.solve``.
+
+Demeaning within a county does not depend on which other counties are in
+the sample, so county fixed effects are bootstrapped the same way on the
+demeaned data. Batch ``i`` always draws from child ``i`` of
+``np.random.SeedSequence(seed)``, so results do not depend on the number of
+worker processes.
+"""
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from optimedu.regression import CONSTANT, missing_patterns, within_transform
+from optimedu.simulation import DEFAULT_SEED
+
+DEFAULT_REPLICATES = 1000
+DEFAULT_BATCH_SIZE = 250
+DEFAULT_LEVEL = 0.95
+PARALLEL_MIN_ELEMENTS = 50_000_000
+
+
+@dataclass
+class BootstrapFit:
+    """Coefficient draws of every replicate, ``replicates x terms x targets``."""
+
+    features: list
+    targets: list
+    draws: np.ndarray
+
+    def _bounds(self, values, level):
+        tail = (1 - level) / 2 * 100
+        with warnings.catch_warnings():
+            # Targets that could not be fitted have only NaN draws.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanpercentile(values, [tail, 100 - tail], axis=0)
+
+    def coefficient_intervals(self, level=DEFAULT_LEVEL):
+        """Percentile intervals of every coefficient as ``(lower, upper)`` frames."""
+        lower, upper = self._bounds(self.draws, level)
+        index = pd.Index([CONSTANT, *self.features])
+        return (pd.DataFrame(lower, index=index, columns=self.targets),
+                pd.DataFrame(upper, index=index, columns=self.targets))
+
+    def prediction_intervals(self, values, level=DEFAULT_LEVEL):
+        """Percentile intervals of the predictions for rows of feature ``values``."""
+        values = pd.DataFrame(values, columns=self.features)
+        design = np.column_stack([np.ones(len(values)), values.to_numpy(dtype=np.float64)])
+        lower, upper = self._bounds(np.einsum("rp,bpt->brt", design, self.draws), level)
+        return (pd.DataFrame(lower, columns=self.targets, index=values.index),
+                pd.DataFrame(upper, columns=self.targets, index=values.index))
+
+
+def _cluster_products(codes, clusters, left, right):
+    """Per-cluster ``left' right`` matrices, ``clusters x left columns x right columns``."""
+    products = np.empty((clusters, left.shape[1], right.shape[1]))
+    for i in range(left.shape[1]):
+        for j in range(right.shape[1]):
+            products[:, i, j] = np.bincount(codes, weights=left[:, i] * right[:, j], minlength=clusters)
+    return products
+
+
+def _run_batch(task):
+    seed, size, grams, crosses, sums, sizes = task
+    rng = np.random.default_rng(seed)
+    clusters = len(sizes)
+
+    picks = rng.integers(0, clusters, (size, clusters)) + np.arange(size)[:, None] * clusters
+    counts = np.bincount(picks.ravel(), minlength=size * clusters).reshape(size, clusters).astype(float)
+
+    terms, targets = crosses.shape[1:]
+    gram = (counts @ grams.reshape(clusters, -1)).reshape(size, terms, terms)
+    cross = (counts @ crosses.reshape(clusters, -1)).reshape(size, terms, targets)
+    try:
+        coefficients = np.linalg.solve(gram, cross)
+    except np.linalg.LinAlgError:
+        coefficients = np.linalg.pinv(gram) @ cross
+
+    if sums is None:
+        return coefficients
+    # Demeaned fits have no constant; recover the average effect from the resampled means.
+    means = (counts @ sums) / (counts @ sizes)[:, None]
+    intercept = means[:, terms:] - np.einsum("bk,bkt->bt", means[:, :terms], coefficients)
+    return np.concatenate([intercept[:, None, :], coefficients], axis=1)
+
+
+def cluster_bootstrap(frame, features, targets, cluster="county", effects=(), replicates=DEFAULT_REPLICATES,
+                      seed=DEFAULT_SEED, workers=1, batch_size=DEFAULT_BATCH_SIZE):
+    """Bootstrap the fit of ``targets`` on ``features`` by resampling whole ``cluster`` groups.
+
+    ``effects`` may be empty (pooled OLS with a constant) or contain only the
+    cluster column (fixed effects for it). Rows missing a feature are
+    dropped, and each target is resampled from the rows where it is present,
+    as in :func:`~optimedu.regression.fit_ols`. Targets with too few rows or
+    clusters get NaN draws.
+    """
+    features, targets, effects = list(features), list(targets), tuple(effects)
+    if effects not in ((), (cluster,)):
+        raise ValueError(f"Cluster bootstrap supports pooled OLS or {cluster} fixed effects only.")
+
+    X = frame[features].to_numpy(dtype=np.float64, na_value=np.nan)
+    Y = frame[targets].to_numpy(dtype=np.float64, na_value=np.nan)
+    complete = ~np.isnan(X).any(axis=1)
+    X, Y = X[complete], Y[complete]
+    labels = frame.loc[complete, cluster].to_numpy()
+
+    num_batches = -(-replicates // batch_size)
+    children = np.random.SeedSequence(seed).spawn(num_batches)
+    tasks, task_columns = [], []
+    for rows, columns in missing_patterns(Y):
+        values = np.column_stack([X[rows], Y[rows][:, columns]])
+        codes = pd.factorize(labels[rows])[0]
+        clusters = int(codes.max(initial=-1)) + 1
+        if clusters < 2 or len(values) <= len(features) + (clusters if effects else 1):
+            continue
+        sizes = np.bincount(codes, minlength=clusters).astype(float)
+
+        if effects:
+            within = within_transform(values, [codes])
+            design, responses = within[:, :len(features)], within[:, len(features):]
+            sums = _cluster_products(codes, clusters, np.ones((len(values), 1)), values)[:, 0, :]
+        else:
+            design = np.column_stack([np.ones(len(values)), values[:, :len(features)]])
+            responses = values[:, len(features):]
+            sums = None
+
+        grams = _cluster_products(codes, clusters, design, design)
+        crosses = _cluster_products(codes, clusters, design, responses)
+        # Every group draws from the same children, so a target's draws do not depend on the others.
+        tasks.extend(
+            (child, min(batch_size, replicates - index * batch_size), grams, crosses, sums, sizes)
+            for index, child in enumerate(children)
+        )
+        task_columns.append(columns)
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(_run_batch, tasks))
+    else:
+        results = list(map(_run_batch, tasks))
+
+    draws = np.full((replicates, len(features) + 1, len(targets)), np.nan)
+    for group, columns in enumerate(task_columns):
+        draws[:, :, columns] = np.concatenate(results[group * num_batches:(group + 1) * num_batches])
+    return BootstrapFit(features=features, targets=targets, draws=draws)
@@ -0,0 +1,176 @@
+"""Cross-session memoization of the forecaster's expensive steps.
+
+Both caches are ``st.cache_data`` caches, so they are shared by every session
+served by the process and evict least-recently-used entries once
+``CACHE_MAX_ENTRIES`` is reached. Inputs are normalized before they reach the
+cached functions so that equivalent scenarios (reordered or zero weights,
+float noise in the investment amount) share a single entry.
+"""
+
+import os
+
+import streamlit as st
+
+from optimedu.adaptive import run_adaptive_simulation
+from optimedu.allocation import find_allocation
+from optimedu.batch import forecast_counties
+from optimedu.correlated import DEFAULT_SHARD_SIZE, run_correlated_simulation
+from optimedu.enrollment import fit_enrollment
+from optimedu.portfolio import portfolio_moments
+from optimedu.sweep import sensitivity_sweep
+from optimedu.simulation import DEFAULT_SEED, run_simulation, run_streaming_simulation
+
+CACHE_MAX_ENTRIES = 256
+DENSE_PATH_LIMIT = 100_000
+
+
+def normalize_counts(student_counts):
+    return tuple(int(count) for count in student_counts)
+
+
+def normalize_weights(weights):
+    return tuple(sorted((asset, float(weight)) for asset, weight in weights.items() if weight))
+
+
+def normalize_amount(amount):
+    return round(float(amount), 2)
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_enrollment_fit(student_counts):
+    return fit_enrollment(student_counts)
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_simulation(required_investment, weights, seed, months, num_simulations, correlated, method):
+    if correlated:
+        return run_correlated_simulation(
+            required_investment,
+            dict(weights),
+            months=months,
+            num_simulations=num_simulations,
+            seed=seed,
+            workers=os.cpu_count() if num_simulations > DEFAULT_SHARD_SIZE else 1,
+            streaming=num_simulations > DENSE_PATH_LIMIT,
+            method=method,
+        )
+
+    expected_return, expected_volatility = portfolio_moments(dict(weights))
+    simulate = run_streaming_simulation if num_simulations > DENSE_PATH_LIMIT else run_simulation
+    return simulate(
+        required_investment,
+        expected_return,
+        expected_volatility,
+        months=months,
+        num_simulations=num_simulations,
+        seed=seed,
+        method=method,
+    )
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_adaptive_simulation(required_investment, weights, target, seed, months, correlated, method, tolerance):
+    return run_adaptive_simulation(
+        required_investment,
+        dict(weights),
+        target,
+        correlated=correlated,
+        months=months,
+        method=method,
+        band_tolerance=tolerance,
+        probability_tolerance=tolerance,
+        seed=seed,
+    )
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_allocation_search(deficit, assets, coverage, seed, correlated):
+    return find_allocation(deficit, assets, coverage=coverage, seed=seed, correlated=correlated)
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_county_forecasts(dataset_key, goal_per_student, _frame):
+    return forecast_counties(_frame, goal_per_student)
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_sensitivity_sweep(next_year_students, investment, weights, swept_asset, budgets, goals, shares, seed,
+                              correlated):
+    return sensitivity_sweep(next_year_students, investment, dict(weights), swept_asset, budgets, goals, shares,
+                             seed=seed, correlated=correlated)
+
+
+def enrollment_fit(student_counts):
+    """Cached :func:`optimedu.enrollment.fit_enrollment`."""
+    return _cached_enrollment_fit(normalize_counts(student_counts))
+
+
+def portfolio_simulation(required_investment, weights, seed=DEFAULT_SEED, months=12, num_simulations=1000,
+                         correlated=False, method="standard"):
+    """Cached Monte Carlo summary for an investment split by percentage ``weights``.
+
+    ``correlated=True`` simulates every asset with correlated returns instead
+    of one asset with the summed volatility. ``method`` picks the sampling
+    method from :data:`optimedu.sampling.SAMPLING_METHODS`. Runs above
+    ``DENSE_PATH_LIMIT`` paths use the streaming simulation.
+    """
+    return _cached_simulation(
+        normalize_amount(required_investment),
+        normalize_weights(weights),
+        int(seed),
+        int(months),
+        int(num_simulations),
+        bool(correlated),
+        method,
+    )
+
+
+def adaptive_portfolio_simulation(required_investment, weights, target, seed=DEFAULT_SEED, months=12,
+                                  correlated=False, method="antithetic", tolerance=0.005):
+    """Cached :func:`optimedu.adaptive.run_adaptive_simulation`.
+
+    ``tolerance`` is used both as the relative band precision and as the
+    absolute precision of the probability of reaching ``target``.
+    """
+    return _cached_adaptive_simulation(
+        normalize_amount(required_investment),
+        normalize_weights(weights),
+        normalize_amount(target),
+        int(seed),
+        int(months),
+        bool(correlated),
+        method,
+        float(tolerance),
+    )
+
+
+def allocation_search(deficit, assets, coverage=0.9, seed=DEFAULT_SEED, correlated=False):
+    """Cached :func:`optimedu.allocation.find_allocation`."""
+    return _cached_allocation_search(
+        normalize_amount(deficit), tuple(sorted(assets)), round(float(coverage), 4), int(seed), bool(correlated)
+    )
+
+
+def county_forecasts(dataset, goal_per_student):
+    """Cached :func:`optimedu.batch.forecast_counties` for a shared dataset.
+
+    The cache is keyed on the dataset's content hash, so the frame itself is
+    never hashed.
+    """
+    return _cached_county_forecasts(dataset.key, normalize_amount(goal_per_student), dataset.frame)
+
+
+def budget_sensitivity_sweep(next_year_students, investment, weights, swept_asset, budgets, goals, shares,
+                             seed=DEFAULT_SEED, correlated=False):
+    """Cached :func:`optimedu.sweep.sensitivity_sweep`."""
+    return _cached_sensitivity_sweep(
+        int(next_year_students),
+        normalize_amount(investment),
+        normalize_weights(weights),
+        swept_asset,
+        tuple(normalize_amount(budget) for budget in budgets),
+        tuple(normalize_amount(goal) for goal in goals),
+        tuple(float(share) for share in shares),
+        int(seed),
+        bool(correlated),
+    )
@@ -0,0 +1,123 @@
+"""Correlated multi-asset Monte Carlo with a sharded process-pool backend.
+
+Each asset is held as its own sleeve and compounded with its own monthly
+returns, which are drawn jointly through the Cholesky factor of the asset
+covariance matrix. The paths are split into fixed-size shards, and shard ``i``
+always draws from child ``i`` of ``np.random.SeedSequence(seed)``, so the
+result depends on ``seed`` and ``shard_size`` but never on how many worker
+processes ran the shards.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from optimedu.portfolio import ASSET_CORRELATION, ASSET_DATA, covariance_matrix
+from optimedu.sampling import standard_normals
+from optimedu.simulation import (
+    DEFAULT_BINS,
+    DEFAULT_PERCENTILES,
+    DEFAULT_SEED,
+    PathHistogram,
+    log_growth_ranges,
+    summarize_histogram,
+    summarize_paths,
+)
+
+DEFAULT_SHARD_SIZE = 50_000
+
+
+def simulate_asset_growth(rng, num_simulations, months, returns, cholesky, method="standard"):
+    """Growth of each asset after each month, ``num_simulations x months x assets``.
+
+    ``returns`` are annual expected returns and ``cholesky`` the lower
+    Cholesky factor of the annual covariance.
+    """
+    normals = standard_normals(rng, num_simulations, (months, len(returns)), method)
+    asset_returns = normals @ (cholesky.T / np.sqrt(12))
+    asset_returns += 1 + returns / 12
+    np.cumprod(asset_returns, axis=1, out=asset_returns)
+    return asset_returns
+
+
+def simulate_portfolio_growth(rng, num_simulations, months, weights, returns, cholesky, method="standard"):
+    """Buy-and-hold portfolio growth after each month, ``num_simulations x months``.
+
+    ``weights`` are fractions of the initial value; any fraction they leave
+    unallocated is held as cash. See :func:`simulate_asset_growth`.
+    """
+    growth = simulate_asset_growth(rng, num_simulations, months, returns, cholesky, method)
+    return growth @ weights + (1 - weights.sum())
+
+
+def expected_portfolio_growth(months, weights, returns):
+    """Closed-form mean of the buy-and-hold growth factor after ``months``."""
+    return (1 + returns / 12) ** months @ weights + (1 - weights.sum())
+
+
+def portfolio_inputs(weights, asset_data=ASSET_DATA, correlation=ASSET_CORRELATION):
+    """Weight fractions, annual returns and covariance of the non-zero holdings."""
+    assets = [asset for asset, weight in weights.items() if weight]
+    fractions = np.array([weights[asset] / 100 for asset in assets])
+    returns = np.array([asset_data[asset]["return"] for asset in assets])
+    return fractions, returns, covariance_matrix(assets, asset_data, correlation)
+
+
+def _run_shard(task):
+    seed, size, months, weights, returns, cholesky, method, bin_layout = task
+    rng = np.random.default_rng(seed)
+    growth = simulate_portfolio_growth(rng, size, months, weights, returns, cholesky, method)
+    if bin_layout is None:
+        return growth
+    histogram = PathHistogram(1.0, *bin_layout)
+    histogram.update(growth)
+    return histogram
+
+
+def run_correlated_simulation(initial_value, weights, months=12, num_simulations=1000, seed=DEFAULT_SEED,
+                              percentiles=DEFAULT_PERCENTILES, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                              streaming=False, bins=DEFAULT_BINS, asset_data=ASSET_DATA,
+                              correlation=ASSET_CORRELATION, method="standard"):
+    """Simulate ``initial_value`` split by percentage ``weights`` into correlated assets.
+
+    With ``streaming=True`` every shard folds its paths into a
+    :class:`~optimedu.simulation.PathHistogram` and only the histograms are
+    merged, as in :func:`~optimedu.simulation.run_streaming_simulation`.
+    ``workers > 1`` runs the shards in a process pool.
+    """
+    fractions, returns, covariance = portfolio_inputs(weights, asset_data, correlation)
+    cholesky = np.linalg.cholesky(covariance)
+
+    bin_layout = None
+    if streaming:
+        portfolio_return = fractions @ returns
+        portfolio_volatility = np.sqrt(fractions @ covariance @ fractions)
+        centers, half_widths = log_growth_ranges(months, portfolio_return, portfolio_volatility, spread=10.0)
+        bin_layout = (centers, half_widths, bins)
+
+    num_shards = -(-num_simulations // shard_size)
+    tasks = [
+        (child, min(shard_size, num_simulations - index * shard_size), months, fractions, returns, cholesky, method, bin_layout)
+        for index, child in enumerate(np.random.SeedSequence(seed).spawn(num_shards))
+    ]
+
+    if workers > 1 and num_shards > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, num_shards)) as executor:
+            return _combine(initial_value, num_simulations, months, percentiles, streaming,
+                            executor.map(_run_shard, tasks))
+    return _combine(initial_value, num_simulations, months, percentiles, streaming, map(_run_shard, tasks))
+
+
+def _combine(initial_value, num_simulations, months, percentiles, streaming, results):
+    """Reduce shard results, in shard order, to a summary."""
+    if not streaming:
+        paths = np.empty((num_simulations, months + 1))
+        paths[:, 0] = initial_value
+        paths[:, 1:] = np.concatenate(list(results)) * initial_value
+        return summarize_paths(paths, percentiles)
+
+    histogram = next(results)
+    for other in results:
+        histogram.merge(other)
+    histogram.initial_value = initial_value
+    return summarize_histogram(histogram, num_simulations, percentiles)
@@ -0,0 +1,391 @@
+"""Parsing and caching of the county-year CSV files the pages accept.
+
+CSVs are read in chunks of ``CHUNK_ROWS`` rows with an explicit schema: the
+documented metric columns are coerced to ``float32`` (unparseable values
+become NaN), ``county`` becomes a categorical and ``year`` an ``int16``, and
+rows without a valid ``county-year`` are dropped chunk by chunk. An upload
+is written to Parquet one chunk per row group as it is parsed, so parsing
+memory is bounded by the chunk size rather than the file size.
+
+A parsed upload is stored as Parquet under ``CACHE_DIR``, named after the
+SHA-256 of the uploaded bytes; files unused for a week, or beyond
+``CACHE_MAX_BYTES`` in total, are evicted least recently used first. On top of that every process keeps one shared,
+read-only :class:`Dataset` per file in an ``st.cache_resource`` cache, so all
+sessions and pages read the same in-memory copy, and derived views such as
+the regression fits are computed once per dataset instead of per page.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+from pandas.api.types import is_numeric_dtype, union_categoricals
+
+from optimedu.bootstrap import DEFAULT_REPLICATES, PARALLEL_MIN_ELEMENTS, cluster_bootstrap
+from optimedu.paths import CACHE_DIR
+from optimedu.regression import fit_fixed_effects, fit_ols
+from optimedu.validation import quality_report
+
+CACHE_MAX_ENTRIES = 16
+CACHE_MAX_BYTES = int(os.environ.get("OPTIMEDU_CACHE_MAX_BYTES", 4 * 1024 ** 3))
+CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600
+CHUNK_ROWS = 200_000
+
+METRIC_COLUMNS = [
+    "spending_per_student",
+    "student_teacher_ratio",
+    "per_pupil_instructional_spending",
+    "math_score",
+    "reading_score",
+    "graduation_rate",
+    "higher_education_pursuit_rate",
+]
+SCHEMA = {
+    **{column: "float32" for column in METRIC_COLUMNS},
+    "enrollment": "float32",
+    "total_budget": "float64",
+}
+
+
+class MissingCountyYearError(ValueError):
+    """The uploaded CSV has no ``county-year`` column."""
+
+
+class CountyYearIndex:
+    """Row positions of every ``(county, year)`` pair plus sorted picklists."""
+
+    def __init__(self, frame):
+        groups = frame.groupby(["county", "year"], observed=True, sort=True).indices
+        self.rows = {(county, int(year)): positions for (county, year), positions in groups.items()}
+        self.counties = sorted({county for county, _ in self.rows})
+        self.years = sorted({year for _, year in self.rows}, reverse=True)
+
+    def positions(self, county, year):
+        return self.rows.get((county, int(year)), np.empty(0, dtype=np.intp))
+
+
+class Dataset:
+    """Shared, read-only view of one parsed upload.
+
+    ``frame`` hands out shallow copies; with pandas copy-on-write (always on
+    from pandas 3, which ``requirements.txt`` pins), writing to one copies
+    only the touched column and never reaches the shared data.
+    Derived views are built lazily and cached on the instance.
+    """
+
+    def __init__(self, key, frame):
+        self.key = key
+        self._frame = frame
+        self._views = {}
+        self._lock = threading.RLock()
+
+    @property
+    def frame(self):
+        return self._frame.copy(deep=False)
+
+    @property
+    def columns(self):
+        return self._frame.columns
+
+    def __len__(self):
+        return len(self._frame)
+
+    def _view(self, name, columns, build):
+        key = (name, tuple(columns))
+        with self._lock:
+            if key not in self._views:
+                self._views[key] = build(list(columns))
+            return self._views[key]
+
+    def moments(self, columns):
+        """Column means and sample standard deviations (``ddof=1``)."""
+        def build(columns):
+            values = self._frame[columns]
+            return values.mean(), values.std()
+
+        return self._view("moments", columns, build)
+
+    def county_year_index(self):
+        """The :class:`CountyYearIndex` of this dataset, built on first use."""
+        return self._view("county_year_index", ("county", "year"), lambda columns: CountyYearIndex(self._frame))
+
+    def rows_for(self, county, year):
+        """Rows for one county and year, found by index lookup instead of a scan."""
+        return self._frame.iloc[self.county_year_index().positions(county, year)]
+
+    def quality_report(self):
+        """The :class:`~optimedu.validation.QualityReport` of this dataset, built on first use."""
+        def build(columns):
+            return quality_report(
+                self._frame,
+                METRIC_COLUMNS,
+                ingest=self._frame.attrs["ingest"],
+                unique_keys=len(self.county_year_index().rows),
+            )
+
+        return self._view("quality_report", (), build)
+
+    def ols(self, features, targets, effects=()):
+        """:class:`~optimedu.regression.OLSFit` of ``targets`` on ``features`` in original units.
+
+        Standardizing before the fit and undoing it after only rescales the
+        coefficients, so the fit is run on the raw columns and predictions
+        need no scaling at all. ``effects`` names columns (``county``,
+        ``year``) to absorb as fixed effects.
+        """
+        features, effects = list(features), tuple(effects)
+
+        def build(targets):
+            if effects:
+                return fit_fixed_effects(self._frame, features, targets, effects)
+            return fit_ols(self._frame[features], self._frame[targets])
+
+        return self._view(("ols", tuple(features), effects), targets, build)
+
+    def bootstrap(self, features, targets, effects=(), replicates=DEFAULT_REPLICATES):
+        """County-cluster :class:`~optimedu.bootstrap.BootstrapFit` of :meth:`ols`."""
+        features, effects = list(features), tuple(effects)
+
+        def build(targets):
+            clusters = self._frame["county"].nunique()
+            workers = os.cpu_count() if clusters * replicates > PARALLEL_MIN_ELEMENTS else 1
+            return cluster_bootstrap(self._frame, features, targets, effects=effects,
+                                     replicates=replicates, workers=workers)
+
+        return self._view(("bootstrap", tuple(features), effects, replicates), targets, build)
+
+
+def split_county_year(df):
+    """Return ``df`` with ``county`` and ``year`` split out of ``county-year``.
+
+    Rows whose ``county-year`` is not of the form ``CountyName-YYYY`` are
+    dropped. This matches ``^(.+)-(\\d{4})$`` but uses string slicing, which
+    is several times faster than a regex extract on large files.
+    """
+    county_year = df["county-year"].astype(str)
+    year = county_year.str[-4:]
+    valid = county_year.str.len().ge(6) & county_year.str[-5:-4].eq("-") & year.str.isdigit()
+    df = df[valid].assign(county=county_year[valid].str[:-5], year=year[valid].astype(int))
+    return df
+
+
+def normalize_columns(columns):
+    return columns.str.lower().str.replace(" ", "_")
+
+
+def new_ingest_counts():
+    return {"dropped_rows": 0, "coercion_failures": {}}
+
+
+def clean_county_year_frame(df, ingest=None):
+    """Apply the schema to one chunk and replace ``county-year`` by ``county`` and ``year``.
+
+    When ``ingest`` is given (see :func:`new_ingest_counts`), the rows dropped
+    for a malformed ``county-year`` and the non-empty values that failed
+    numeric coercion are added to it.
+    """
+    df.columns = normalize_columns(df.columns)
+    if "county-year" not in df.columns:
+        raise MissingCountyYearError("CSV file must contain a 'county-year' column.")
+
+    rows = len(df)
+    df = split_county_year(df).drop(columns=["county-year"])
+    if ingest is not None:
+        ingest["dropped_rows"] += rows - len(df)
+
+    for column, dtype in SCHEMA.items():
+        if column in df.columns:
+            coerced = pd.to_numeric(df[column], errors="coerce")
+            if ingest is not None:
+                failures = int((coerced.isna() & df[column].notna()).sum())
+                failed = ingest["coercion_failures"]
+                failed[column] = failed.get(column, 0) + failures
+            df[column] = coerced.astype(dtype)
+    return df.astype({"county": "category", "year": "int16"})
+
+
+def _clean_chunks(source, chunk_rows, progress, ingest):
+    """Cleaned chunks of a county-year CSV; a header-only file gives one empty chunk."""
+    size = source.seek(0, os.SEEK_END) if hasattr(source, "seek") else None
+    if size is not None:
+        source.seek(0)
+
+    empty = True
+    with pd.read_csv(source, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            empty = False
+            yield clean_county_year_frame(chunk, ingest)
+            if progress is not None and size:
+                progress(min(source.tell() / size, 1.0))
+
+    if empty:
+        source.seek(0)
+        yield clean_county_year_frame(pd.read_csv(source, nrows=0))
+
+
+def read_county_year_csv(source, chunk_rows=CHUNK_ROWS, progress=None):
+    """Read a county-year CSV chunk by chunk into one compact frame.
+
+    ``progress`` is called with the fraction of ``source`` consumed so far
+    when ``source`` is a seekable buffer. The ingest counts are returned in
+    ``df.attrs["ingest"]``.
+    """
+    ingest = new_ingest_counts()
+    chunks = list(_clean_chunks(source, chunk_rows, progress, ingest))
+    if len(chunks) == 1:
+        df = chunks[0].reset_index(drop=True)
+    else:
+        counties = union_categoricals([chunk["county"] for chunk in chunks], sort_categories=True)
+        df = pd.concat(chunks, ignore_index=True)
+        df["county"] = counties
+    df.attrs["ingest"] = ingest
+    return df
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _parquet_path(key):
+    return CACHE_DIR / f"{key}.parquet"
+
+
+def _conform(chunk, columns):
+    """Give the columns outside ``SCHEMA`` the types they had in the first chunk."""
+    for column, numeric in columns.items():
+        if numeric:
+            chunk[column] = pd.to_numeric(chunk[column], errors="coerce").astype("float64")
+        else:
+            chunk[column] = chunk[column].astype("string")
+    return chunk
+
+
+def write_county_year_parquet(source, path, chunk_rows=CHUNK_ROWS, progress=None):
+    """Parse a county-year CSV into a Parquet file at ``path``, one row group per chunk.
+
+    Only one chunk is held in memory at a time. Columns outside ``SCHEMA``
+    take the type of the first chunk: numeric ones become ``float64`` (later
+    unparseable values become NaN), the rest strings. The ingest counts are
+    stored in the file's ``ingest`` metadata.
+    """
+    ingest = new_ingest_counts()
+    writer = extra_columns = None
+    try:
+        for chunk in _clean_chunks(source, chunk_rows, progress, ingest):
+            if writer is None:
+                extra_columns = {
+                    column: is_numeric_dtype(chunk[column])
+                    for column in chunk.columns if column not in SCHEMA and column not in ("county", "year")
+                }
+                schema = pa.Schema.from_pandas(_conform(chunk, extra_columns), preserve_index=False)
+                schema = schema.set(
+                    schema.get_field_index("county"), pa.field("county", pa.dictionary(pa.int32(), pa.string()))
+                )
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(pa.Table.from_pandas(_conform(chunk, extra_columns), schema=schema, preserve_index=False))
+        writer.add_key_value_metadata({"ingest": json.dumps(ingest)})
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def evict_parquet_files(keep=None, max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE_SECONDS):
+    """Trim the Parquet cache by age and total size.
+
+    Files unused for ``max_age`` seconds are deleted, then the least recently
+    used ones until the rest fit in ``max_bytes``. The file for ``keep`` is
+    never deleted.
+    """
+    now = time.time()
+    files = []
+    for path in CACHE_DIR.glob("*.parquet"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    for modified, size, path in sorted(files, key=lambda file: file[0]):
+        if path.stem == keep or (now - modified <= max_age and total <= max_bytes):
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def _parse_to_parquet(key, data, progress=None):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix=".tmp", delete=False) as partial:
+        try:
+            write_county_year_parquet(BytesIO(data), partial, progress=progress)
+        except BaseException:
+            os.unlink(partial.name)
+            raise
+    os.replace(partial.name, _parquet_path(key))
+    evict_parquet_files(keep=key)
+
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _dataset_by_hash(key):
+    path = _parquet_path(key)
+    frame = pd.read_parquet(path)
+    # Row groups carry their own county dictionaries; keep the picklists sorted.
+    frame["county"] = frame["county"].cat.reorder_categories(sorted(frame["county"].cat.categories))
+    frame.attrs["ingest"] = json.loads(pq.read_metadata(path).metadata[b"ingest"])
+    return Dataset(key, frame)
+
+
+def load_dataset(uploaded_file, show_progress=True):
+    """Shared :class:`Dataset` for an uploaded county-year CSV, parsed at most once per file.
+
+    When the file has to be parsed, a progress bar is shown on the page
+    unless ``show_progress`` is false. Raises :class:`MissingCountyYearError`
+    when the file has no ``county-year`` column. The content hash is kept per
+    ``file_id`` in ``st.session_state``, so reruns do not hash the file again.
+    """
+    hashes = st.session_state.setdefault("upload_hashes", {})
+    key = hashes.get(uploaded_file.file_id)
+    if key is None:
+        key = hashes[uploaded_file.file_id] = content_hash(uploaded_file.getvalue())
+    try:
+        # Mark the file as recently used for evict_parquet_files.
+        os.utime(_parquet_path(key))
+    except FileNotFoundError:
+        placeholder = st.empty() if show_progress else None
+
+        def progress(fraction):
+            placeholder.progress(fraction, text=f"⏳ Reading CSV... {fraction:.0%}")
+
+        try:
+            _parse_to_parquet(key, uploaded_file.getvalue(), progress if show_progress else None)
+        finally:
+            if placeholder is not None:
+                placeholder.empty()
+    return _dataset_by_hash(key)
+
+
+def active_dataset(uploaded_file):
+    """The dataset for ``uploaded_file``, or the one last uploaded on any page.
+
+    The key of a successfully loaded upload is kept in ``st.session_state`` so
+    other pages of the same session can read the dataset without a new upload.
+    Returns ``None`` when there is neither.
+    """
+    if uploaded_file is not None:
+        dataset = load_dataset(uploaded_file)
+        st.session_state.dataset_key = dataset.key
+        return dataset
+
+    key = st.session_state.get("dataset_key")
+    if key is not None and _parquet_path(key).exists():
+        return _dataset_by_hash(key)
+    return None
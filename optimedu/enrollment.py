@@ -0,0 +1,8 @@
+"""Enrollment projection for the Budget & Investment Forecaster."""
+
+from optimedu.holt import fit_holt
+
+
+def fit_enrollment(student_counts):
+    """Holt linear-trend fit of the yearly enrollment counts."""
+    return fit_holt([float(count) for count in student_counts])
@@ -0,0 +1,186 @@
+"""Chat completion helpers for the AI-Powered Recommendations page.
+
+Responses are cached in two tiers keyed by the model and the normalized
+messages: an in-process LRU for the hot entries and a SQLite file under
+``CACHE_DIR`` that survives restarts and is shared by every process. Both
+expire entries after ``RESPONSE_TTL_SECONDS``.
+
+Requests go through one client per process (see :func:`make_client`), whose
+HTTP connection pool is reused across sessions. At most
+``MAX_CONCURRENT_REQUESTS`` requests are in flight per process, and rate
+limit and connection errors are retried with full-jitter exponential
+backoff before the first token arrives.
+"""
+
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from optimedu.paths import CACHE_DIR
+
+RESPONSE_CACHE_PATH = CACHE_DIR / "llm-responses.sqlite3"
+RESPONSE_TTL_SECONDS = 7 * 24 * 3600
+LRU_MAX_ENTRIES = 128
+
+REQUEST_TIMEOUT_SECONDS = 60.0
+CONNECT_TIMEOUT_SECONDS = 10.0
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+MAX_CONCURRENT_REQUESTS = 8
+
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+
+def make_client(api_key, base_url=None, timeout=REQUEST_TIMEOUT_SECONDS, connect_timeout=CONNECT_TIMEOUT_SECONDS):
+    """An OpenAI client with explicit timeouts and retries left to :func:`create_with_retries`.
+
+    ``base_url`` points the client at another chat-completions endpoint,
+    such as ``scripts/mock_llm_server.py``.
+    """
+    import openai
+
+    return openai.OpenAI(
+        api_key=api_key,
+        base_url=base_url or None,
+        timeout=openai.Timeout(timeout, connect=connect_timeout),
+        max_retries=0,
+    )
+
+
+def backoff_delay(attempt, error=None):
+    """Seconds to wait before retry ``attempt`` (0-based).
+
+    Draws uniformly up to the capped exponential bound. When the error
+    carries a ``Retry-After`` header, the draw is added on top of it so that
+    throttled sessions do not all retry at the same moment.
+    """
+    jitter = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return min(float(retry_after) + jitter, BACKOFF_MAX_SECONDS)
+    except (TypeError, ValueError):
+        return jitter
+
+
+def create_with_retries(client, max_retries=MAX_RETRIES, **request):
+    """``client.chat.completions.create(**request)``, retried on rate limits and dropped connections."""
+    import openai
+
+    for attempt in range(max_retries + 1):
+        try:
+            return client.chat.completions.create(**request)
+        except (openai.RateLimitError, openai.APIConnectionError) as error:
+            if attempt == max_retries:
+                raise
+            time.sleep(backoff_delay(attempt, error))
+
+
+def normalize_text(text):
+    return " ".join(text.split())
+
+
+def response_key(model, messages):
+    """Cache key of a request; whitespace differences do not change it."""
+    normalized = [{"role": message["role"], "content": normalize_text(message["content"])} for message in messages]
+    payload = json.dumps({"model": model, "messages": normalized}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """In-process LRU in front of a SQLite table of responses, both with a TTL."""
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, ttl=RESPONSE_TTL_SECONDS, max_entries=LRU_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created REAL)")
+
+    def _execute(self, sql, params=()):
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                return db.execute(sql, params).fetchone()
+        finally:
+            db.close()
+
+    def _remember(self, key, value, created):
+        with self._lock:
+            self._entries[key] = (value, created)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """The cached response for ``key``, or ``None`` if absent or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+        row = self._execute(
+            "SELECT value, created FROM responses WHERE key = ? AND created > ?", (key, now - self.ttl)
+        )
+        if row is None:
+            return None
+        self._remember(key, *row)
+        return row[0]
+
+    def set(self, key, value):
+        created = time.time()
+        self._execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, value, created))
+        self._remember(key, value, created)
+
+    def clear(self):
+        """Drop every cached response from this process's LRU and from the shared file."""
+        with self._lock:
+            self._entries.clear()
+        self._execute("DELETE FROM responses")
+
+
+class CompletionStream:
+    """Iterator over the text chunks of a chat completion.
+
+    A cached response is yielded as a single chunk with ``from_cache`` set;
+    otherwise the completion is streamed from ``client`` and, unless it is
+    empty, stored in ``cache`` once it has been read to the end.
+    """
+
+    def __init__(self, client, model, messages, cache):
+        self.client = client
+        self.model = model
+        self.messages = messages
+        self.cache = cache
+        self.key = response_key(model, messages)
+        self.cached_text = cache.get(self.key)
+        self.from_cache = bool(self.cached_text)
+
+    def __iter__(self):
+        if self.from_cache:
+            yield self.cached_text
+            return
+
+        parts = []
+        with _request_slots:
+            stream = create_with_retries(self.client, model=self.model, messages=self.messages, stream=True)
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        # An empty completion (filtered, or no content deltas) is not worth replaying.
+        if parts:
+            self.cache.set(self.key, "".join(parts))
+
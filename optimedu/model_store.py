@@ -0,0 +1,75 @@
+"""On-disk store of the Impact Analyzer's regression models.
+
+A model is saved as the :class:`~optimedu.regression.SufficientStatistics`
+of the rows it was fitted on, one ``.npz`` file per model under
+``MODEL_DIR``. New school years are merged into the saved statistics, so a
+model can be updated and reloaded without its history.
+"""
+
+import os
+import re
+import tempfile
+
+import numpy as np
+
+from optimedu.paths import CACHE_DIR
+from optimedu.regression import SufficientStatistics
+
+MODEL_DIR = CACHE_DIR / "models"
+
+
+def model_path(name):
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "-", name.strip()).strip("-") or "model"
+    return MODEL_DIR / f"{slug}.npz"
+
+
+def list_models():
+    if not MODEL_DIR.exists():
+        return []
+    return sorted(path.stem for path in MODEL_DIR.glob("*.npz"))
+
+
+def save_model(name, statistics):
+    """Write ``statistics`` under ``name``, replacing any model of that name."""
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    path = model_path(name)
+    with tempfile.NamedTemporaryFile(dir=MODEL_DIR, suffix=".tmp", delete=False) as partial:
+        np.savez(
+            partial,
+            features=np.array(statistics.features, dtype=str),
+            targets=np.array(statistics.targets, dtype=str),
+            count=statistics.count,
+            mean=statistics.mean,
+            comoment=statistics.comoment,
+            years=np.array(statistics.years, dtype=np.int64),
+        )
+    os.replace(partial.name, path)
+    return path.stem
+
+
+def load_model(name):
+    with np.load(model_path(name)) as data:
+        return SufficientStatistics(
+            features=tuple(data["features"].tolist()),
+            targets=tuple(data["targets"].tolist()),
+            count=data["count"],
+            mean=data["mean"],
+            comoment=data["comoment"],
+            years=tuple(data["years"].tolist()),
+        )
+
+
+def append_rows(name, frame):
+    """Merge the school years of ``frame`` not yet in model ``name`` and save it.
+
+    Returns the updated statistics and the years that were skipped because
+    the model already contains them.
+    """
+    statistics = load_model(name)
+    skipped = sorted(set(frame["year"].unique().tolist()) & set(statistics.years))
+    new_rows = frame[~frame["year"].isin(skipped)]
+    statistics = statistics.merge(
+        SufficientStatistics.from_frame(new_rows, statistics.features, statistics.targets)
+    )
+    save_model(name, statistics)
+    return statistics, skipped
@@ -0,0 +1,11 @@
+"""Locations shared by the dataset, model and response caches.
+
+Kept free of third-party imports so that pages which only need a cache path
+(the recommendations page) do not load pandas or Streamlit's data stack.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("OPTIMEDU_CACHE_DIR", Path(tempfile.gettempdir()) / "optimedu-datasets"))
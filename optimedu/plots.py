@@ -0,0 +1,77 @@
+"""Cached partial regression figures for the Impact Analyzer.
+
+Each figure is rendered once per dataset, target and set of features and
+kept as PNG bytes in an ``st.cache_data`` cache, so reruns (slider moves,
+toggles) reuse it instead of redrawing. Above ``SCATTER_ROW_LIMIT`` rows
+the scatter is replaced by a hexbin density with the same fitted line,
+which costs about the same however many rows there are.
+"""
+
+from io import BytesIO
+
+import numpy as np
+import streamlit as st
+
+PLOT_CACHE_ENTRIES = 64
+SCATTER_ROW_LIMIT = 50_000
+HEXBIN_GRID_SIZE = 60
+LINE_COLOR = "#2a818c"
+
+
+def _density_panel(ax, x, y):
+    x = x.to_numpy(dtype=np.float64, na_value=np.nan)
+    y = y.to_numpy(dtype=np.float64, na_value=np.nan)
+    complete = np.isfinite(x) & np.isfinite(y)
+    x, y = x[complete], y[complete]
+
+    ax.hexbin(x, y, gridsize=HEXBIN_GRID_SIZE, mincnt=1, cmap="Greys", bins="log")
+    if len(x) > 1:
+        slope, intercept = np.polyfit(x, y, 1)
+        ends = np.array([x.min(), x.max()])
+        ax.plot(ends, intercept + slope * ends, color=LINE_COLOR, linewidth=2.5)
+
+
+def render_partial_regressions(frame, features, target, feature_labels, title):
+    """PNG of ``target`` against each of ``features``, one panel per feature."""
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(15, 5))
+    axes = fig.subplots(1, len(features), squeeze=False)[0]
+    dense = len(frame) > SCATTER_ROW_LIMIT
+
+    for i, col in enumerate(features):
+        if dense:
+            _density_panel(axes[i], frame[col], frame[target])
+        else:
+            sns.regplot(
+                x=frame[col],
+                y=frame[target],
+                ax=axes[i],
+                ci=None,
+                scatter_kws={"alpha": 0.4, "color": "gray", "s": 80},
+                line_kws={"color": LINE_COLOR, "linewidth": 2.5},
+            )
+
+        if i == len(features) // 2:
+            axes[i].set_title(f"{title} vs Independent Variables", fontsize=14)
+
+        axes[i].set_xlabel(feature_labels[i], fontsize=12)
+        axes[i].set_ylabel("")
+        axes[i].grid(False)
+
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=PLOT_CACHE_ENTRIES, show_spinner=False)
+def _cached_partial_regressions(dataset_key, features, target, feature_labels, title, _frame):
+    return render_partial_regressions(_frame, list(features), target, list(feature_labels), title)
+
+
+def partial_regression_png(dataset, features, target, feature_labels, title):
+    """Cached :func:`render_partial_regressions` for a shared dataset."""
+    return _cached_partial_regressions(
+        dataset.key, tuple(features), target, tuple(feature_labels), title, dataset.frame,
+    )
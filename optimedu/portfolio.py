@@ -0,0 +1,51 @@
+"""Asset assumptions and portfolio moments for the investment forecaster."""
+
+import numpy as np
+
+ASSET_DATA = {
+    "Stocks": {"return": 0.10, "volatility": 0.15},  # 10% annual return, 15% volatility
+    "Bonds": {"return": 0.04, "volatility": 0.05},   # 4% annual return, 5% volatility
+    "ETFs": {"return": 0.08, "volatility": 0.12},    # 8% annual return, 12% volatility
+    "REITs": {"return": 0.07, "volatility": 0.14},   # 7% annual return, 14% volatility
+    "Cryptocurrency": {"return": 0.30, "volatility": 0.60}  # 30% return, but high risk (60% vol)
+}
+
+# Pairwise correlations of annual returns; each pair is listed once.
+ASSET_CORRELATION = {
+    ("Stocks", "Bonds"): 0.10,
+    ("Stocks", "ETFs"): 0.90,
+    ("Stocks", "REITs"): 0.60,
+    ("Stocks", "Cryptocurrency"): 0.30,
+    ("Bonds", "ETFs"): 0.15,
+    ("Bonds", "REITs"): 0.20,
+    ("Bonds", "Cryptocurrency"): 0.00,
+    ("ETFs", "REITs"): 0.60,
+    ("ETFs", "Cryptocurrency"): 0.30,
+    ("REITs", "Cryptocurrency"): 0.20,
+}
+
+
+def correlation_matrix(assets, correlation=ASSET_CORRELATION):
+    matrix = np.eye(len(assets))
+    for i, first in enumerate(assets):
+        for j, second in enumerate(assets[:i]):
+            value = correlation.get((first, second), correlation.get((second, first), 0.0))
+            matrix[i, j] = matrix[j, i] = value
+    return matrix
+
+
+def covariance_matrix(assets, asset_data=ASSET_DATA, correlation=ASSET_CORRELATION):
+    """Annual covariance of the returns of ``assets``, in the given order."""
+    volatilities = np.array([asset_data[asset]["volatility"] for asset in assets])
+    return correlation_matrix(assets, correlation) * np.outer(volatilities, volatilities)
+
+
+def portfolio_moments(weights, asset_data=ASSET_DATA):
+    """Expected annual return and volatility for percentage ``weights``.
+
+    Volatility is the weighted sum of the asset volatilities, i.e. the assets
+    are treated as perfectly correlated.
+    """
+    expected_return = sum(weight / 100 * asset_data[asset]["return"] for asset, weight in weights.items())
+    expected_volatility = sum(weight / 100 * asset_data[asset]["volatility"] for asset, weight in weights.items())
+    return expected_return, expected_volatility
@@ -0,0 +1,333 @@
+"""Ordinary least squares for several targets sharing one design matrix.
+
+The Impact Analyzer regresses every outcome on the same spending columns, so
+the design matrix is factorized once with a QR decomposition and all targets
+are solved against that factorization together. Rows with a missing feature
+are dropped; targets with missing values get one extra factorization per
+distinct missing-value pattern, which gives the same complete-case estimates
+as fitting each target separately.
+
+For models that grow a year at a time, :class:`SufficientStatistics` keeps
+only each target's row count, column means and centered cross-product matrix.
+Statistics of new rows are merged in with Chan's pairwise update, and the
+fit is recovered from them without the original rows.
+
+:func:`statsmodels_summary` builds the full statsmodels report for a single
+target and is only meant to be called when that report is shown.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+CONSTANT = "const"
+DEMEAN_TOLERANCE = 1e-10
+DEMEAN_MAX_ITERATIONS = 1000
+RANK_TOLERANCE = 1e-10
+
+
+class MissingFeatureError(ValueError):
+    """Scenarios to score lack one of the model's features."""
+
+
+@dataclass
+class OLSFit:
+    """Coefficients, standard errors and fit statistics of every target.
+
+    ``coefficients`` and ``standard_errors`` have one row per term (the
+    constant first) and one column per target.
+    """
+
+    coefficients: pd.DataFrame
+    standard_errors: pd.DataFrame
+    r_squared: pd.Series
+    nobs: pd.Series
+
+    @property
+    def features(self):
+        return list(self.coefficients.index[1:])
+
+    @property
+    def targets(self):
+        return list(self.coefficients.columns)
+
+    def predict(self, values):
+        """Predictions for a frame (or mapping) of feature values, one column per target."""
+        values = pd.DataFrame(values, columns=self.features)
+        design = np.column_stack([np.ones(len(values)), values.to_numpy(dtype=np.float64)])
+        return pd.DataFrame(design @ self.coefficients.to_numpy(), columns=self.targets, index=values.index)
+
+
+def _solve(design, responses, absorbed=0):
+    """Coefficients, standard errors and R² of ``responses`` on ``design``.
+
+    ``absorbed`` is the number of parameters already removed from the data
+    (fixed effects), which the residual degrees of freedom must account for.
+    """
+    q, r = np.linalg.qr(design)
+    diagonal = np.abs(np.diag(r))
+    rank = int(np.sum(diagonal > RANK_TOLERANCE * diagonal.max(initial=0.0)))
+    if rank == design.shape[1]:
+        r_inverse = np.linalg.inv(r)
+    else:
+        # Collinear columns: take the minimum-norm solution, as statsmodels does.
+        r_inverse = np.linalg.pinv(r)
+    coefficients = r_inverse @ (q.T @ responses)
+    residuals = responses - design @ coefficients
+
+    dof = len(design) - rank - absorbed
+    sigma2 = np.sum(residuals ** 2, axis=0) / dof if dof > 0 else np.full(responses.shape[1], np.nan)
+    # diag((X'X)^+) is the squared row norms of R^+.
+    unscaled = np.sum(r_inverse ** 2, axis=1)
+    standard_errors = np.sqrt(np.outer(unscaled, sigma2))
+
+    total = np.sum((responses - responses.mean(axis=0)) ** 2, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_squared = 1 - np.sum(residuals ** 2, axis=0) / total
+    return coefficients, standard_errors, r_squared
+
+
+def missing_patterns(values):
+    """Group the columns of ``values`` by the rows in which they are present.
+
+    Returns ``(rows, columns)`` pairs: a row selector and the indices of the
+    columns present in exactly those rows. Columns are grouped by hashing
+    their masks, so rows are never sorted; without NaNs there is one group
+    selecting every row.
+    """
+    present = ~np.isnan(values)
+    if present.all():
+        return [(slice(None), np.arange(values.shape[1]))]
+    groups = {}
+    for column in range(values.shape[1]):
+        groups.setdefault(present[:, column].tobytes(), []).append(column)
+    return [(present[:, columns[0]], np.array(columns)) for columns in groups.values()]
+
+
+def fit_ols(features, targets):
+    """Regress every column of ``targets`` on the columns of ``features`` plus a constant."""
+    X = features.to_numpy(dtype=np.float64, na_value=np.nan)
+    Y = targets.to_numpy(dtype=np.float64, na_value=np.nan)
+    complete = ~np.isnan(X).any(axis=1)
+    design = np.column_stack([np.ones(complete.sum()), X[complete]])
+    Y = Y[complete]
+
+    terms = design.shape[1]
+    coefficients = np.full((terms, Y.shape[1]), np.nan)
+    standard_errors = np.full((terms, Y.shape[1]), np.nan)
+    r_squared = np.full(Y.shape[1], np.nan)
+    nobs = np.zeros(Y.shape[1], dtype=np.int64)
+
+    for rows, columns in missing_patterns(Y):
+        subset = design[rows]
+        nobs[columns] = len(subset)
+        if len(subset) < terms:
+            continue
+        solved = _solve(subset, Y[rows][:, columns])
+        coefficients[:, columns], standard_errors[:, columns], r_squared[columns] = solved
+
+    index = pd.Index([CONSTANT, *features.columns])
+    return OLSFit(
+        coefficients=pd.DataFrame(coefficients, index=index, columns=targets.columns),
+        standard_errors=pd.DataFrame(standard_errors, index=index, columns=targets.columns),
+        r_squared=pd.Series(r_squared, index=targets.columns),
+        nobs=pd.Series(nobs, index=targets.columns),
+    )
+
+
+def _group_demean(values, codes, counts):
+    """Subtract the mean of each group from every column of ``values``."""
+    means = np.column_stack([
+        np.bincount(codes, weights=values[:, column], minlength=len(counts)) for column in range(values.shape[1])
+    ]) / counts[:, None]
+    return values - means[codes]
+
+
+def within_transform(values, groupings, tolerance=DEMEAN_TOLERANCE, max_iterations=DEMEAN_MAX_ITERATIONS):
+    """Remove every grouping's means from ``values`` (``rows x columns``).
+
+    ``groupings`` holds one integer code array per effect. A single effect is
+    removed exactly; several are removed by alternating projections until
+    the values stop changing.
+    """
+    groupings = [(codes, np.bincount(codes)) for codes in groupings]
+    scale = max(float(np.abs(values).max(initial=0.0)), 1.0)
+    for _ in range(max_iterations if len(groupings) > 1 else 1):
+        previous = values
+        for codes, counts in groupings:
+            values = _group_demean(values, codes, counts)
+        if np.abs(values - previous).max(initial=0.0) <= tolerance * scale:
+            break
+    return values
+
+
+def fit_fixed_effects(frame, features, targets, effects=("county",)):
+    """Panel regression of ``targets`` on ``features`` with fixed effects for ``effects``.
+
+    The effects are absorbed by the within transformation instead of dummy
+    columns, so the fit costs about as much as pooled OLS however many
+    counties there are. Rows missing a feature are dropped, and each target
+    is fitted on the rows where it is present, as in :func:`fit_ols`. The
+    constant of the returned fit is the average fixed effect, so
+    predictions describe an average county (and year); its standard error
+    is not estimated.
+    """
+    features, targets, effects = list(features), list(targets), list(effects)
+    X = frame[features].to_numpy(dtype=np.float64, na_value=np.nan)
+    Y = frame[targets].to_numpy(dtype=np.float64, na_value=np.nan)
+    complete = ~np.isnan(X).any(axis=1)
+    X, Y = X[complete], Y[complete]
+    labels = [frame.loc[complete, effect].to_numpy() for effect in effects]
+
+    terms = len(features)
+    coefficients = np.full((terms + 1, len(targets)), np.nan)
+    standard_errors = np.full((terms + 1, len(targets)), np.nan)
+    r_squared = np.full(len(targets), np.nan)
+    nobs = np.zeros(len(targets), dtype=np.int64)
+
+    for rows, columns in missing_patterns(Y):
+        values = np.column_stack([X[rows], Y[rows][:, columns]])
+        groupings = [pd.factorize(label[rows])[0] for label in labels]
+        absorbed = sum(int(codes.max(initial=-1)) + 1 for codes in groupings) - max(len(groupings) - 1, 0)
+        nobs[columns] = len(values)
+        if len(values) <= terms + absorbed:
+            continue
+
+        within = within_transform(values, groupings)
+        solved = _solve(within[:, :terms], within[:, terms:], absorbed)
+        coefficients[1:, columns], standard_errors[1:, columns], r_squared[columns] = solved
+        means = values.mean(axis=0)
+        coefficients[0, columns] = means[terms:] - means[:terms] @ coefficients[1:, columns]
+
+    index = pd.Index([CONSTANT, *features])
+    return OLSFit(
+        coefficients=pd.DataFrame(coefficients, index=index, columns=targets),
+        standard_errors=pd.DataFrame(standard_errors, index=index, columns=targets),
+        r_squared=pd.Series(r_squared, index=targets),
+        nobs=pd.Series(nobs, index=targets),
+    )
+
+
+@dataclass
+class SufficientStatistics:
+    """Row counts, means and centered cross-products of the features and each target.
+
+    Every target keeps its own statistics over the rows complete in all
+    features and that target, so its fit matches :func:`fit_ols`.
+    ``count`` has one entry per target, ``mean`` one row of feature means
+    followed by the target mean per target, and ``comoment`` one matrix per
+    target. ``years`` records which school years have been folded in.
+    """
+
+    features: tuple
+    targets: tuple
+    count: np.ndarray
+    mean: np.ndarray
+    comoment: np.ndarray
+    years: tuple = ()
+
+    @classmethod
+    def from_frame(cls, frame, features, targets):
+        X = frame[list(features)].to_numpy(dtype=np.float64, na_value=np.nan)
+        Y = frame[list(targets)].to_numpy(dtype=np.float64, na_value=np.nan)
+        complete = ~np.isnan(X).any(axis=1)
+
+        k = len(features)
+        count = np.zeros(len(targets), dtype=np.int64)
+        mean = np.zeros((len(targets), k + 1))
+        comoment = np.zeros((len(targets), k + 1, k + 1))
+        used = np.zeros(len(frame), dtype=bool)
+        for t in range(len(targets)):
+            rows = complete & ~np.isnan(Y[:, t])
+            values = np.column_stack([X[rows], Y[rows, t]])
+            if len(values):
+                centered = values - values.mean(axis=0)
+                count[t], mean[t], comoment[t] = len(values), values.mean(axis=0), centered.T @ centered
+            used |= rows
+
+        years = frame.loc[used, "year"].unique() if "year" in frame.columns else ()
+        return cls(
+            features=tuple(features),
+            targets=tuple(targets),
+            count=count,
+            mean=mean,
+            comoment=comoment,
+            years=tuple(sorted(int(year) for year in years)),
+        )
+
+    def merge(self, other):
+        """Statistics of the rows of ``self`` and ``other`` together."""
+        if (self.features, self.targets) != (other.features, other.targets):
+            raise ValueError("Cannot merge statistics of different models.")
+        count = self.count + other.count
+        share = np.divide(other.count, count, out=np.zeros(len(count)), where=count > 0)
+        delta = other.mean - self.mean
+        return SufficientStatistics(
+            features=self.features,
+            targets=self.targets,
+            count=count,
+            mean=self.mean + delta * share[:, None],
+            comoment=(self.comoment + other.comoment
+                      + np.einsum("ti,tj->tij", delta, delta) * (self.count * share)[:, None, None]),
+            years=tuple(sorted(set(self.years) | set(other.years))),
+        )
+
+    def fit(self):
+        """The :class:`OLSFit` these statistics determine.
+
+        Targets with no more rows than terms get NaN coefficients, as in
+        :func:`fit_ols`.
+        """
+        k = len(self.features)
+        terms = k + 1
+        coefficients = np.full((terms, len(self.targets)), np.nan)
+        standard_errors = np.full((terms, len(self.targets)), np.nan)
+        r_squared = np.full(len(self.targets), np.nan)
+
+        for t in np.flatnonzero(self.count >= terms):
+            x_mean, y_mean = self.mean[t, :k], self.mean[t, k]
+            sxx, sxy, syy = self.comoment[t, :k, :k], self.comoment[t, :k, k], self.comoment[t, k, k]
+
+            # The pseudo-inverse gives the minimum-norm solution when columns are collinear.
+            inverse = np.linalg.pinv(sxx)
+            slopes = inverse @ sxy
+            ssr = syy - sxy @ slopes
+
+            dof = self.count[t] - terms
+            sigma2 = ssr / dof if dof > 0 else np.nan
+            unscaled = np.concatenate([[1 / self.count[t] + x_mean @ inverse @ x_mean], np.diag(inverse)])
+            coefficients[:, t] = np.concatenate([[y_mean - x_mean @ slopes], slopes])
+            standard_errors[:, t] = np.sqrt(unscaled * sigma2)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r_squared[t] = 1 - ssr / syy
+
+        index = pd.Index([CONSTANT, *self.features])
+        columns = list(self.targets)
+        return OLSFit(
+            coefficients=pd.DataFrame(coefficients, index=index, columns=columns),
+            standard_errors=pd.DataFrame(standard_errors, index=index, columns=columns),
+            r_squared=pd.Series(r_squared, index=columns),
+            nobs=pd.Series(self.count, index=columns),
+        )
+
+
+def score_scenarios(fit, scenarios):
+    """Return ``scenarios`` with a ``predicted_<target>`` column for every target.
+
+    All rows are scored with one matrix product. Raises
+    :class:`MissingFeatureError` when a feature column is absent.
+    """
+    missing = [feature for feature in fit.features if feature not in scenarios.columns]
+    if missing:
+        raise MissingFeatureError(f"Scenarios are missing columns: {', '.join(missing)}.")
+
+    values = scenarios[fit.features].apply(pd.to_numeric, errors="coerce")
+    return pd.concat([scenarios, fit.predict(values).add_prefix("predicted_")], axis=1)
+
+
+def statsmodels_summary(features, target):
+    """Full statsmodels OLS summary of one target, fitted on complete cases."""
+    import statsmodels.api as sm
+
+    return sm.OLS(target, sm.add_constant(features), missing="drop").fit().summary()
@@ -0,0 +1,29 @@
+"""Standard normal draws for the Monte Carlo engines.
+
+``"standard"`` draws plain pseudo-random normals, ``"antithetic"`` pairs every
+draw with its negation and ``"sobol"`` maps a scrambled Sobol sequence through
+the normal inverse CDF. All methods take their randomness from the given
+``np.random.Generator``, so runs stay reproducible from a seed.
+"""
+
+import numpy as np
+
+SAMPLING_METHODS = ("standard", "antithetic", "sobol")
+
+
+def standard_normals(rng, num_paths, shape, method="standard"):
+    """Return a ``(num_paths, *shape)`` array of standard normal draws."""
+    if method == "standard":
+        return rng.standard_normal((num_paths,) + shape)
+    if method == "antithetic":
+        half = rng.standard_normal(((num_paths + 1) // 2,) + shape)
+        return np.concatenate([half, -half])[:num_paths]
+    if method == "sobol":
+        from scipy.stats import norm, qmc
+
+        engine = qmc.Sobol(d=int(np.prod(shape)), scramble=True, seed=rng)
+        # Draw a full power-of-two block to keep the sequence balanced.
+        points = engine.random_base2(max(int(np.ceil(np.log2(max(num_paths, 1)))), 0))[:num_paths]
+        np.clip(points, 1e-12, 1 - 1e-12, out=points)
+        return norm.ppf(points).reshape((num_paths,) + shape)
+    raise ValueError(f"Unknown sampling method {method!r}; expected one of {SAMPLING_METHODS}.")
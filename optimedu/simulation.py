@@ -0,0 +1,218 @@
+"""Monte Carlo engine for the Budget & Investment Forecaster.
+
+Every path is driven by independent normal monthly shocks and compounded
+multiplicatively, the same model the forecaster page has always used, but the
+whole shock matrix is drawn in a single call and compounded with
+``np.cumprod`` instead of a Python loop per path and month.
+
+For very large runs :func:`run_streaming_simulation` generates the paths in
+fixed-size chunks and only keeps per-month log-space histograms, so memory use
+depends on the chunk size and bin count rather than on the number of paths.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from optimedu.sampling import standard_normals
+
+DEFAULT_SEED = 42
+DEFAULT_PERCENTILES = (5, 95)
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_BINS = 4096
+
+
+@dataclass
+class SimulationSummary:
+    """Per-month median and percentile bands of a set of simulated paths."""
+
+    median: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    final_values: np.ndarray
+    num_simulations: int
+    final_histogram: "PathHistogram" = None
+
+    @property
+    def months(self):
+        return len(self.median) - 1
+
+    def probability_at_least(self, target):
+        if self.final_values is None:
+            return self.final_histogram.probability_at_least(target, column=-1)
+        return float(np.mean(self.final_values >= target))
+
+
+class PathHistogram:
+    """Fixed-bin histograms of ``log(value / initial_value)``, one per month.
+
+    Each month gets its own bin range (``spread`` standard deviations of the
+    compounded log return around its mean), plus an underflow and an overflow
+    bin whose quantiles fall back to the exact minimum and maximum seen.
+    """
+
+    def __init__(self, initial_value, centers, half_widths, bins=DEFAULT_BINS):
+        self.initial_value = initial_value
+        self.bins = bins
+        self.lo = np.asarray(centers, dtype=float) - half_widths
+        self.width = 2 * np.asarray(half_widths, dtype=float) / bins
+        self.counts = np.zeros((len(self.lo), bins + 2), dtype=np.int64)
+        self.minimum = np.full(len(self.lo), np.inf)
+        self.maximum = np.full(len(self.lo), -np.inf)
+        self.total = 0
+
+    def update(self, growth):
+        """Add a ``paths x months`` block of cumulative growth factors."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_growth = np.log(growth)
+        log_growth[~(growth > 0)] = -np.inf
+
+        idx = np.floor((log_growth - self.lo) / self.width)
+        idx = np.clip(idx, -1, self.bins).astype(np.int64) + 1
+        idx += np.arange(len(self.lo)) * (self.bins + 2)
+        self.counts += np.bincount(idx.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+        np.minimum(self.minimum, growth.min(axis=0), out=self.minimum)
+        np.maximum(self.maximum, growth.max(axis=0), out=self.maximum)
+        self.total += growth.shape[0]
+
+    def merge(self, other):
+        """Fold in a histogram built with the same bin layout."""
+        self.counts += other.counts
+        np.minimum(self.minimum, other.minimum, out=self.minimum)
+        np.maximum(self.maximum, other.maximum, out=self.maximum)
+        self.total += other.total
+
+    def quantile(self, q):
+        """Per-month value at quantile ``q`` (0-1), interpolated inside a bin."""
+        cumulative = np.cumsum(self.counts, axis=1)
+        rank = q * (self.total - 1) + 1
+        values = np.empty(len(self.lo))
+        for col in range(len(self.lo)):
+            slot = int(np.searchsorted(cumulative[col], rank))
+            if slot == 0:
+                growth = self.minimum[col]
+            elif slot == self.bins + 1:
+                growth = self.maximum[col]
+            else:
+                below = cumulative[col, slot - 1]
+                fraction = (rank - below) / self.counts[col, slot]
+                growth = np.exp(self.lo[col] + (slot - 1 + fraction) * self.width[col])
+                growth = min(max(growth, self.minimum[col]), self.maximum[col])
+            values[col] = growth * self.initial_value
+        return values
+
+    def probability_at_least(self, target, column=-1):
+        """Share of paths whose value in ``column`` is at least ``target``."""
+        counts = self.counts[column]
+        if target <= 0:
+            return 1.0
+        position = (np.log(target / self.initial_value) - self.lo[column]) / self.width[column]
+        if position < 0:
+            return 1.0 - counts[0] / self.total
+        if position >= self.bins:
+            return counts[-1] / self.total
+        slot = int(position)
+        above = counts[slot + 2:].sum() + counts[slot + 1] * (1 - (position - slot))
+        return float(above / self.total)
+
+
+def monthly_shocks(rng, num_simulations, months, annual_return, annual_volatility, method="standard"):
+    """Draw the full ``num_simulations x months`` matrix of monthly returns."""
+    shocks = standard_normals(rng, num_simulations, (months,), method)
+    shocks *= annual_volatility / np.sqrt(12)
+    shocks += annual_return / 12
+    return shocks
+
+
+def simulate_growth(rng, num_simulations, months, annual_return, annual_volatility, method="standard"):
+    """Cumulative growth factors after each month, ``num_simulations x months``."""
+    shocks = monthly_shocks(rng, num_simulations, months, annual_return, annual_volatility, method)
+    shocks += 1
+    return np.cumprod(shocks, axis=1, out=shocks)
+
+
+def expected_growth(months, annual_return):
+    """Closed-form mean of the compounded growth factor after ``months``."""
+    return (1 + annual_return / 12) ** months
+
+
+def simulate_paths(initial_value, annual_return, annual_volatility, months=12,
+                   num_simulations=1000, seed=DEFAULT_SEED, method="standard"):
+    """Return a ``num_simulations x (months + 1)`` array of portfolio values."""
+    rng = np.random.default_rng(seed)
+
+    paths = np.empty((num_simulations, months + 1))
+    paths[:, 0] = initial_value
+    paths[:, 1:] = simulate_growth(rng, num_simulations, months, annual_return, annual_volatility, method)
+    paths[:, 1:] *= initial_value
+    return paths
+
+
+def summarize_paths(paths, percentiles=DEFAULT_PERCENTILES):
+    lower, median, upper = np.percentile(paths, [percentiles[0], 50, percentiles[1]], axis=0)
+    return SimulationSummary(
+        median=median,
+        lower=lower,
+        upper=upper,
+        final_values=paths[:, -1].copy(),
+        num_simulations=paths.shape[0],
+    )
+
+
+def summarize_histogram(histogram, num_simulations, percentiles=DEFAULT_PERCENTILES):
+    """Build a :class:`SimulationSummary` from a filled :class:`PathHistogram`."""
+    def with_start(values):
+        return np.concatenate([[histogram.initial_value], values])
+
+    return SimulationSummary(
+        median=with_start(histogram.quantile(0.5)),
+        lower=with_start(histogram.quantile(percentiles[0] / 100)),
+        upper=with_start(histogram.quantile(percentiles[1] / 100)),
+        final_values=None,
+        num_simulations=num_simulations,
+        final_histogram=histogram,
+    )
+
+
+def run_simulation(initial_value, annual_return, annual_volatility, months=12,
+                   num_simulations=1000, seed=DEFAULT_SEED, percentiles=DEFAULT_PERCENTILES,
+                   method="standard"):
+    """Simulate the portfolio and reduce the paths to a :class:`SimulationSummary`."""
+    paths = simulate_paths(initial_value, annual_return, annual_volatility, months, num_simulations, seed, method)
+    return summarize_paths(paths, percentiles)
+
+
+def log_growth_ranges(months, annual_return, annual_volatility, spread):
+    """Per-month centre and half-width of the histogram bins in log space."""
+    monthly_mean = annual_return / 12
+    monthly_sd = max(annual_volatility / np.sqrt(12), 1e-9)
+    log_sd = monthly_sd / (1 + monthly_mean)
+    steps = np.arange(1, months + 1)
+    centers = steps * (np.log1p(monthly_mean) - log_sd ** 2 / 2)
+    half_widths = spread * log_sd * np.sqrt(steps)
+    return centers, half_widths
+
+
+def run_streaming_simulation(initial_value, annual_return, annual_volatility, months=12,
+                             num_simulations=1_000_000, seed=DEFAULT_SEED,
+                             percentiles=DEFAULT_PERCENTILES, chunk_size=DEFAULT_CHUNK_SIZE,
+                             bins=DEFAULT_BINS, spread=10.0, method="standard"):
+    """Bounded-memory variant of :func:`run_simulation`.
+
+    Paths are generated ``chunk_size`` at a time, each chunk from its own
+    child of ``np.random.SeedSequence(seed)``, and folded into a
+    :class:`PathHistogram`. Only the histograms survive between chunks, so
+    the returned summary has ``final_values=None`` and answers
+    ``probability_at_least`` from ``final_histogram`` instead.
+    """
+    centers, half_widths = log_growth_ranges(months, annual_return, annual_volatility, spread)
+    histogram = PathHistogram(initial_value, centers, half_widths, bins)
+
+    num_chunks = -(-num_simulations // chunk_size)
+    for index, child in enumerate(np.random.SeedSequence(seed).spawn(num_chunks)):
+        size = min(chunk_size, num_simulations - index * chunk_size)
+        rng = np.random.default_rng(child)
+        histogram.update(simulate_growth(rng, size, months, annual_return, annual_volatility, method))
+
+    return summarize_histogram(histogram, num_simulations, percentiles)
@@ -0,0 +1,84 @@
+"""Sensitivity sweep over budget, funding goal and allocation.
+
+The deficit for every ``current_budget x goal_per_student`` pair and the
+probability that a fixed investment closes it under every allocation are
+computed as broadcast array operations over the whole grid. All allocations
+share one set of draws, under the same two risk models as
+:mod:`optimedu.allocation`.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from optimedu.correlated import simulate_asset_growth
+from optimedu.portfolio import ASSET_CORRELATION, ASSET_DATA, covariance_matrix
+from optimedu.simulation import DEFAULT_SEED
+
+
+@dataclass
+class SensitivitySweep:
+    """Deficit ``(budgets, goals)`` and closing probability ``(budgets, goals, shares)``."""
+
+    budgets: np.ndarray
+    goals: np.ndarray
+    shares: np.ndarray
+    swept_asset: str
+    deficit: np.ndarray
+    probability: np.ndarray
+
+
+def sweep_weights(weights, swept_asset, shares):
+    """Weight vectors giving ``swept_asset`` each share, other assets keeping their ratios.
+
+    Returns the asset names and a ``(len(shares), len(assets))`` percentage array.
+    """
+    assets = list(dict.fromkeys([swept_asset, *weights]))
+    others = np.array([weights.get(asset, 0) for asset in assets[1:]], dtype=float)
+    if others.sum() > 0:
+        others /= others.sum()
+    elif len(others):
+        others[:] = 1 / len(others)
+    else:
+        # A single asset: the rest of the portfolio is held as cash.
+        others = np.zeros(0)
+
+    shares = np.asarray(shares, dtype=float)
+    matrix = np.column_stack([shares, (100 - shares)[:, None] * others[None, :]]) if len(others) else shares[:, None]
+    return assets, matrix
+
+
+def sensitivity_sweep(next_year_students, investment, weights, swept_asset, budgets, goals, shares,
+                      months=12, num_simulations=2000, seed=DEFAULT_SEED, correlated=False,
+                      asset_data=ASSET_DATA, correlation=ASSET_CORRELATION):
+    """Deficit and probability that ``investment`` covers it over the whole grid."""
+    budgets = np.asarray(budgets, dtype=float)
+    goals = np.asarray(goals, dtype=float)
+    assets, allocation = sweep_weights(weights, swept_asset, shares)
+    fractions = allocation / 100
+    returns = np.array([asset_data[asset]["return"] for asset in assets])
+    rng = np.random.default_rng(seed)
+
+    if correlated:
+        cholesky = np.linalg.cholesky(covariance_matrix(assets, asset_data, correlation))
+        asset_growth = simulate_asset_growth(rng, num_simulations, months, returns, cholesky)[:, -1]
+        growth = fractions @ asset_growth.T + (1 - fractions.sum(axis=1))[:, None]
+    else:
+        volatilities = np.array([asset_data[asset]["volatility"] for asset in assets])
+        monthly_mean = fractions @ returns / 12
+        monthly_sd = fractions @ volatilities / np.sqrt(12)
+        normals = rng.standard_normal((num_simulations, months))
+        growth = (1 + monthly_mean[:, None, None] + monthly_sd[:, None, None] * normals).prod(axis=2)
+
+    deficit = next_year_students * goals[None, :] - budgets[:, None]
+    final_value = investment * growth
+    probability = np.mean(final_value[None, None, :, :] >= deficit[:, :, None, None], axis=3)
+
+    return SensitivitySweep(
+        budgets=budgets,
+        goals=goals,
+        shares=np.asarray(shares, dtype=float),
+        swept_asset=swept_asset,
+        deficit=deficit,
+        probability=probability,
+    )
@@ -0,0 +1,100 @@
+"""Data-quality report for parsed county-year uploads.
+
+All checks are whole-column array operations over one float matrix of the
+metric columns. Values that failed numeric coercion are counted while the
+CSV is parsed (see :func:`optimedu.datasets.read_county_year_csv`), since
+they are NaN by the time the frame exists.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+PERCENT_COLUMNS = ["graduation_rate", "higher_education_pursuit_rate"]
+POSITIVE_COLUMNS = ["spending_per_student", "per_pupil_instructional_spending", "total_budget"]
+
+
+@dataclass
+class QualityReport:
+    """Per-column and per-file findings for one upload.
+
+    ``columns`` has one row per checked column with ``null_rate``,
+    ``coercion_failures`` and ``out_of_range`` counts.
+    """
+
+    rows: int
+    missing_columns: list
+    dropped_rows: int
+    duplicate_keys: int
+    columns: pd.DataFrame
+
+    @property
+    def ok(self):
+        return not self.issues()
+
+    def issues(self):
+        """Human-readable findings, most severe first."""
+        messages = []
+        if self.missing_columns:
+            messages.append(f"Missing columns: {', '.join(self.missing_columns)}.")
+        if self.dropped_rows:
+            messages.append(f"{self.dropped_rows:,} rows skipped: 'county-year' is not of the form 'CountyName-YYYY'.")
+        if self.duplicate_keys:
+            messages.append(f"{self.duplicate_keys:,} rows repeat a county-year already in the file.")
+        for column, row in self.columns.iterrows():
+            if row["coercion_failures"] > 0:
+                messages.append(f"{column}: {int(row['coercion_failures']):,} values are not numbers.")
+            if row["out_of_range"] > 0:
+                messages.append(f"{column}: {int(row['out_of_range']):,} values are out of range.")
+        return messages
+
+
+def out_of_range_counts(values, columns):
+    """Count values outside each column's valid range, NaNs excluded."""
+    counts = np.zeros(len(columns), dtype=np.int64)
+    percent = np.isin(columns, PERCENT_COLUMNS)
+    positive = np.isin(columns, POSITIVE_COLUMNS)
+    with np.errstate(invalid="ignore"):
+        if percent.any():
+            block = values[:, percent]
+            counts[percent] = np.sum((block < 0) | (block > 100), axis=0)
+        if positive.any():
+            counts[positive] = np.sum(values[:, positive] <= 0, axis=0)
+    return counts
+
+
+def quality_report(frame, expected_columns, ingest, unique_keys=None):
+    """Validate ``frame`` against ``expected_columns``.
+
+    ``ingest`` holds the counts collected while parsing (``dropped_rows`` and
+    a ``coercion_failures`` mapping). ``unique_keys`` is the number of
+    distinct county-year pairs when already known.
+    """
+    missing = [column for column in expected_columns if column not in frame.columns]
+    columns = list(dict.fromkeys(column for column in [*expected_columns, *POSITIVE_COLUMNS]
+                                 if column in frame.columns))
+
+    values = frame[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    rows = len(frame)
+    null_rate = np.isnan(values).mean(axis=0) if rows else np.zeros(len(columns))
+
+    failures = [ingest["coercion_failures"].get(column, 0) for column in columns]
+
+    if unique_keys is None:
+        unique_keys = len(frame[["county", "year"]].drop_duplicates())
+
+    return QualityReport(
+        rows=rows,
+        missing_columns=missing,
+        dropped_rows=ingest["dropped_rows"],
+        duplicate_keys=rows - unique_keys,
+        columns=pd.DataFrame(
+            {
+                "null_rate": null_rate,
+                "coercion_failures": np.array(failures, dtype=np.int64),
+                "out_of_range": out_of_range_counts(values, np.array(columns)),
+            },
+            index=pd.Index(columns, name="column"),
+        ),
+    )
@@ -1,5 +1,8 @@
+import os
+
 import streamlit as st
-import openai
+
+from optimedu.llm import CompletionStream, ResponseCache, make_client
 
 
 st.set_page_config(
@@ -61,14 +64,36 @@ with st.container():
     """, unsafe_allow_html=True)
 
 
-openai_key = st.secrets.get("openai_key")
+def secret(name):
+    try:
+        return st.secrets.get(name)
+    except FileNotFoundError:
+        return None
+
 
-if not openai_key:
-    st.error("🚨 Missing OpenAI API key! Please set 'openai_key' in Streamlit secrets.")
+openai_key = secret("openai_key")
+openai_base_url = secret("openai_base_url") or os.environ.get("OPENAI_BASE_URL")
+
+if not openai_key and not openai_base_url:
+    st.error("🚨 Missing OpenAI API key! Please set 'openai_key' in Streamlit secrets, or 'openai_base_url' (or OPENAI_BASE_URL) for a local endpoint.")
     st.stop()
 
 
-client = openai.OpenAI(api_key=openai_key)  # ✅ Use OpenAI's new client method
+@st.cache_resource
+def llm_client(api_key, base_url):
+    return make_client(api_key, base_url=base_url)
+
+
+# Local stand-ins such as scripts/mock_llm_server.py do not check the key.
+client = llm_client(openai_key or "not-needed", openai_base_url)
+
+
+@st.cache_resource
+def response_cache():
+    return ResponseCache()
+
+
+cache = response_cache()
 
 
 if "recommendation" not in st.session_state:
@@ -93,36 +118,37 @@ def generate_recommendations():
         if metric != "Choose an option" and change != "Choose an option":
             prompt = f"A school wants to {change.lower()} its {metric.lower()}. Provide specific recommendations on how they can achieve this goal while maintaining educational quality."
             
-            with st.status("⏳ Generating recommendations, please wait..."):
-                try:
-                    response = client.chat.completions.create(
-                        model="gpt-4",
-                        messages=[{"role": "system", "content": prompt}]
-                    )
-                    st.session_state.recommendation = response.choices[0].message.content
-                    st.success("✅ Recommendations generated successfully!")
-                    st.markdown(f"<h3 style='color: #0D47A1;'>📌 Generated Recommendations:</h3>", unsafe_allow_html=True)
-                    st.write(st.session_state.recommendation)
-                except Exception as e:
-                    st.error(f"Error generating recommendations: {e}")
+            try:
+                stream = CompletionStream(client, "gpt-4", [{"role": "system", "content": prompt}], cache)
+                st.markdown(f"<h3 style='color: #0D47A1;'>📌 Generated Recommendations:</h3>", unsafe_allow_html=True)
+                st.session_state.recommendation = st.write_stream(stream)
+                st.success("✅ Recommendations loaded from cache!" if stream.from_cache else "✅ Recommendations generated successfully!")
+            except Exception as e:
+                st.error(f"Error generating recommendations: {e}")
 
     if st.session_state.recommendation:
         st.markdown("<h2 style='text-align: center; color: #0D47A1;'>💬 Ask Questions About the Recommendations</h2>", unsafe_allow_html=True)
         user_question = st.text_input("Enter your question about the recommendations:")
         if user_question:
-            with st.status("⏳ Generating response..."):
-                try:
-                    chat_response = client.chat.completions.create(
-                        model="gpt-4",
-                        messages=[
-                            {"role": "system", "content": f"Based on these recommendations: {st.session_state.recommendation}, answer this question: {user_question}"}
-                        ]
-                    )
-                    st.session_state.chat_response = chat_response.choices[0].message.content
-                    st.success("✅ Response generated successfully!")
-                    st.markdown(f"<h3 style='color: #0D47A1;'>🤖 Chatbot Response:</h3>", unsafe_allow_html=True)
-                    st.write(st.session_state.chat_response)
-                except Exception as e:
-                    st.error(f"Error generating chatbot response: {e}")
+            try:
+                stream = CompletionStream(
+                    client,
+                    "gpt-4",
+                    [
+                        {"role": "system", "content": f"Based on these recommendations: {st.session_state.recommendation}, answer this question: {user_question}"}
+                    ],
+                    cache,
+                )
+                st.markdown(f"<h3 style='color: #0D47A1;'>🤖 Chatbot Response:</h3>", unsafe_allow_html=True)
+                st.session_state.chat_response = st.write_stream(stream)
+                st.success("✅ Response loaded from cache!" if stream.from_cache else "✅ Response generated successfully!")
+            except Exception as e:
+                st.error(f"Error generating chatbot response: {e}")
 
 generate_recommendations()
+
+with st.sidebar:
+    st.caption(f"AI responses are cached for {cache.ttl // 86400} days.")
+    if st.button("🗑️ Clear cached AI responses"):
+        cache.clear()
+        st.success("Cached responses cleared.")
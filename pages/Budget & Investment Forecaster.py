@@ -1,9 +1,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
-import yfinance as yf
-import matplotlib.pyplot as plt
+
+from optimedu.cache import (
+    DENSE_PATH_LIMIT,
+    adaptive_portfolio_simulation,
+    allocation_search,
+    budget_sensitivity_sweep,
+    county_forecasts,
+    enrollment_fit,
+    portfolio_simulation,
+)
+from optimedu.datasets import MissingCountyYearError, load_dataset
+from optimedu.holt import VALIDATION_TOLERANCE, validate_against_statsmodels
+from optimedu.portfolio import portfolio_moments
 
 with st.container():
     st.markdown("""
@@ -42,14 +52,22 @@ st.subheader("📈 Student Enrollment Projection")
 df_students["Year"] = pd.to_numeric(df_students["Year"])
 
 
-model = ExponentialSmoothing(df_students["Students"], trend="add", seasonal=None)
-fit_model = model.fit()
-forecast_result = fit_model.forecast(steps=1)
-next_year_students = int(forecast_result.iloc[0]) if isinstance(forecast_result, pd.Series) else int(forecast_result[0])
+enrollment = enrollment_fit(df_students["Students"])
+next_year_students = int(enrollment.forecast(1)[0])
 
 
 st.write(f"📊 **Projected Student Count for 2026:** {next_year_students}")
 
+if st.checkbox("Validate the enrollment projection against statsmodels"):
+    validation = validate_against_statsmodels(df_students["Students"], enrollment)
+    reference_students = int(validation.reference.forecast(1)[0])
+    if validation.within_tolerance:
+        st.success(f"✅ statsmodels projects {reference_students} students, within {VALIDATION_TOLERANCE:.0%} of the fast fitter.")
+    elif validation.better_fit:
+        st.info(f"ℹ️ statsmodels projects {reference_students} students, but stopped at a worse fit (SSE {validation.reference.sse:,.0f} vs {enrollment.sse:,.0f}).")
+    else:
+        st.warning(f"⚠️ statsmodels projects {reference_students} students, {validation.relative_difference:.1%} away from the fast fitter.")
+
 
 st.subheader("💰 Budget Deficit Analysis")
 
@@ -80,17 +98,7 @@ if deficit > 0:
         st.warning("⚠️ Allocations must sum to 100%. Adjust your selections.")
 
 
-    asset_data = {
-        "Stocks": {"return": 0.10, "volatility": 0.15},  # 10% annual return, 15% volatility
-        "Bonds": {"return": 0.04, "volatility": 0.05},   # 4% annual return, 5% volatility
-        "ETFs": {"return": 0.08, "volatility": 0.12},    # 8% annual return, 12% volatility
-        "REITs": {"return": 0.07, "volatility": 0.14},   # 7% annual return, 14% volatility
-        "Cryptocurrency": {"return": 0.30, "volatility": 0.60}  # 30% return, but high risk (60% vol)
-    }
-
-
-    expected_return = sum(weights[asset] / 100 * asset_data[asset]["return"] for asset in investment_choices)
-    expected_volatility = sum(weights[asset] / 100 * asset_data[asset]["volatility"] for asset in investment_choices)
+    expected_return, expected_volatility = portfolio_moments(weights)
 
 
     required_investment = deficit / (1 + expected_return)
@@ -99,27 +107,74 @@ if deficit > 0:
 
     st.subheader("📊 Monte Carlo Simulation: Investment Growth Over Time")
 
-    months = 12  
-    num_simulations = 1000 
-
-
-    simulations = np.zeros((num_simulations, months + 1))
-    simulations[:, 0] = required_investment 
-
-  
-    np.random.seed(42)  
-    for i in range(num_simulations):
-        for month in range(1, months + 1):
-            random_shock = np.random.normal(loc=expected_return / 12, scale=expected_volatility / np.sqrt(12))
-            simulations[i, month] = simulations[i, month - 1] * (1 + random_shock)
-
+    months = 12
+    correlated = st.toggle("Simulate each asset separately with correlated returns", value=True)
 
-    median_projection = np.median(simulations, axis=0)
-    lower_bound = np.percentile(simulations, 5, axis=0)  
-    upper_bound = np.percentile(simulations, 95, axis=0)  
-
-
-    fig, ax = plt.subplots()
+    sampling_methods = {
+        "Standard": "standard",
+        "Antithetic variates": "antithetic",
+        "Sobol (quasi-random)": "sobol"
+    }
+    sampling = st.selectbox("Sampling method:", list(sampling_methods))
+
+    adaptive = st.toggle("Adaptive precision: add paths only until the results reach a target precision")
+
+    if adaptive:
+        tolerance = st.select_slider(
+            "Target precision (95% interval half-width of the bands and of the coverage probability):",
+            options=[0.02, 0.01, 0.005, 0.0025, 0.001],
+            value=0.005,
+            format_func=lambda value: f"±{value:.2%}"
+        )
+
+        adaptive_run = adaptive_portfolio_simulation(
+            required_investment,
+            weights,
+            deficit,
+            seed=42,
+            months=months,
+            correlated=correlated,
+            method=sampling_methods[sampling],
+            tolerance=tolerance
+        )
+        simulation = adaptive_run.summary
+        coverage_probability = adaptive_run.coverage_probability
+
+        st.caption(
+            f"Used {simulation.num_simulations:,} paths; bands within ±{adaptive_run.band_half_width:.2%}, "
+            f"coverage probability within ±{adaptive_run.probability_half_width:.2%}."
+            + ("" if adaptive_run.converged else " Stopped at the path limit before reaching the target precision.")
+        )
+    else:
+        num_simulations = st.select_slider(
+            "Number of simulated paths:",
+            options=[1000, 10000, 100000, 1000000, 10000000],
+            value=1000
+        )
+
+        if num_simulations > DENSE_PATH_LIMIT:
+            st.caption("Large runs use the bounded-memory streaming mode: paths are generated in chunks and the bands are read from per-month histograms.")
+
+        simulation = portfolio_simulation(
+            required_investment,
+            weights,
+            seed=42,
+            months=months,
+            num_simulations=num_simulations,
+            correlated=correlated,
+            method=sampling_methods[sampling]
+        )
+        coverage_probability = simulation.probability_at_least(deficit)
+
+    median_projection = simulation.median
+    lower_bound = simulation.lower
+    upper_bound = simulation.upper
+
+
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.subplots()
     ax.plot(range(0, months + 1), median_projection, marker="o", linestyle="-", color="blue", label="Median Projection")
     ax.fill_between(range(0, months + 1), lower_bound, upper_bound, color="blue", alpha=0.2, label="5%-95% Confidence Interval")
     ax.set_xlabel("Months")
@@ -133,10 +188,114 @@ if deficit > 0:
 
     final_value = median_projection[-1]
     st.write(f"📈 **Projected Median Growth After 1 Year:** ${int(final_value):,}")
+    st.write(f"🎯 **Probability of Covering the Deficit:** {coverage_probability:.1%}")
     if final_value >= deficit:
         st.success("✅ Your investment is likely to reach the required amount by next year!")
     else:
         st.error(f"⚠️ Your investment may fall short. Consider increasing allocation or risk exposure.")
 
+
+    st.subheader("🔍 Find Allocation")
+
+    coverage = st.slider("Required probability of covering the deficit (%)", 50, 99, 90) / 100
+
+    if investment_choices and st.toggle("Search every allocation of the selected assets"):
+        search = allocation_search(deficit, investment_choices, coverage=coverage, seed=42, correlated=correlated)
+        best = search.best
+
+        st.write(f"💡 **Smallest Investment Covering the Deficit with {coverage:.0%} Probability:** ${int(best['required_investment']):,}")
+        st.table(pd.DataFrame({
+            "Asset": list(search.assets),
+            "Allocation (%)": [int(best[asset]) for asset in search.assets]
+        }))
+
+        fig = Figure()
+        ax = fig.subplots()
+        ax.scatter(search.candidates["expected_volatility"], search.candidates["expected_return"], s=8, color="gray", alpha=0.3, label="Candidate Allocations")
+        ax.plot(search.frontier["expected_volatility"], search.frontier["expected_return"], color="blue", label="Efficient Frontier")
+        ax.scatter([best["expected_volatility"]], [best["expected_return"]], color="red", zorder=3, label="Smallest Required Investment")
+        ax.set_xlabel("Expected Volatility")
+        ax.set_ylabel("Expected Return")
+        ax.set_title("Allocations of the Selected Assets")
+        ax.legend()
+        ax.grid(True)
+
+        st.pyplot(fig)
+
+
+    st.subheader("🧮 Sensitivity Sweep")
+
+    if investment_choices and st.toggle("Sweep budget, goal per student and allocation"):
+        swept_asset = st.selectbox("Allocation to sweep:", investment_choices)
+
+        budgets = np.linspace(0.5 * current_budget, 1.5 * current_budget, 21)
+        goals = np.linspace(0.75 * goal_per_student, 1.25 * goal_per_student, 21)
+        shares = np.arange(0, 101, 10)
+
+        sweep = budget_sensitivity_sweep(next_year_students, required_investment, weights, swept_asset, budgets, goals, shares,
+                                         seed=42, correlated=correlated)
+
+        share = st.select_slider(f"Allocation to {swept_asset} (%)", options=[int(value) for value in shares], value=int(shares[len(shares) // 2]))
+        probability = sweep.probability[:, :, list(shares).index(share)]
+
+        fig = Figure()
+        ax = fig.subplots()
+        image = ax.imshow(
+            probability,
+            origin="lower",
+            aspect="auto",
+            cmap="Blues",
+            vmin=0,
+            vmax=1,
+            extent=[goals[0], goals[-1], budgets[0], budgets[-1]]
+        )
+        if sweep.deficit.min() < 0 < sweep.deficit.max():
+            ax.contour(goals, budgets, sweep.deficit, levels=[0], colors="red", linewidths=1.5)
+        ax.set_xlabel("Goal Funding per Student ($)")
+        ax.set_ylabel("Current Budget ($)")
+        ax.set_title(f"Probability ${int(required_investment):,} Closes the Deficit")
+        fig.colorbar(image, ax=ax, label="Probability")
+
+        st.pyplot(fig)
+        st.caption("Where shown, the red line marks a zero deficit; above and to the left of it the budget already meets the goal.")
+
 else:
     st.write("🎉 Your current budget is sufficient! No investment needed.")
+
+
+st.divider()
+
+st.subheader("🗺️ Batch Forecast for Every County")
+
+st.write("📤 Upload a county-year CSV with an `enrollment` column (and optionally `total_budget`) to project next year's enrollment and deficit for every county, using the goal funding per student above.")
+
+batch_file = st.file_uploader("Upload a .csv file", type=["csv"], key="batch_file")
+
+if batch_file is not None:
+    try:
+        batch_dataset = load_dataset(batch_file)
+    except MissingCountyYearError:
+        batch_dataset = None
+
+    if batch_dataset is None or "enrollment" not in batch_dataset.columns:
+        st.error("CSV file must contain 'county-year' (e.g., 'Gwinnett-2019') and 'enrollment' columns.")
+    else:
+        with st.spinner("⏳ Forecasting every county..."):
+            forecasts = county_forecasts(batch_dataset, goal_per_student)
+
+        st.write(f"📊 **Counties Forecast:** {len(forecasts)} — **With a Deficit:** {int((forecasts['deficit'] > 0).sum())}")
+        st.dataframe(
+            forecasts.sort_values("deficit", ascending=False),
+            width="stretch",
+            hide_index=True,
+            column_config={
+                "latest_year": st.column_config.NumberColumn("Latest Year", format="%d"),
+                "latest_enrollment": st.column_config.NumberColumn("Latest Enrollment"),
+                "next_year_students": st.column_config.NumberColumn("Projected Students"),
+                "current_budget": st.column_config.NumberColumn("Current Budget ($)", format="%.0f"),
+                "required_budget": st.column_config.NumberColumn("Required Budget ($)", format="%.0f"),
+                "deficit": st.column_config.NumberColumn("Deficit ($)", format="%.0f"),
+                "alpha": st.column_config.NumberColumn("Level Smoothing", format="%.3f"),
+                "beta": st.column_config.NumberColumn("Trend Smoothing", format="%.3f")
+            }
+        )
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 
+from optimedu.datasets import MissingCountyYearError, active_dataset
+
 
 st.set_page_config(page_title="OptimEdu Data Uploader", layout="wide")
 
@@ -105,6 +107,7 @@ st.markdown("""
 1. Save the file as `.csv` with **comma-separated values**.
 2. Ensure **column names match exactly** as shown.
 3. Click **Upload CSV File** in the Budget Forecaster.
+4. To forecast every county at once in the **Budget & Investment Forecaster**, add an `enrollment` column (and optionally `total_budget`).
 """)
 
 st.success("Follow these steps to ensure a smooth upload! 🚀")
@@ -113,36 +116,47 @@ st.success("Follow these steps to ensure a smooth upload! 🚀")
 
 uploaded_file = st.file_uploader("Upload a .csv file", type=["csv"])
 
-if uploaded_file is not None:
+if uploaded_file is not None or "dataset_key" in st.session_state:
    
-    df = pd.read_csv(uploaded_file)
-
-    
-    df.columns = df.columns.str.lower().str.replace(" ", "_")
-
-    if "county-year" in df.columns:
-        df["county"] = df["county-year"].str.extract(r'^(.*?)-\d{4}$')  
-        df["year"] = df["county-year"].str.extract(r'-(\d{4})$') 
-        df["year"] = pd.to_numeric(df["year"], errors="coerce")  
+    try:
+        dataset = active_dataset(uploaded_file)
+    except MissingCountyYearError:
+        dataset = None
 
+    if dataset is not None:
+        df = dataset.frame
 
-        df.dropna(subset=["year"], inplace=True)
-        df["year"] = df["year"].astype(int)
+        if uploaded_file is None:
+            st.caption("📎 Showing the dataset uploaded earlier in this session.")
 
-     
-        if df["county"].isna().all() or df["year"].isna().all():
+        if df.empty:
             st.error("⚠️ Could not extract 'county' or 'year' from 'county-year'. Ensure format is 'CountyName-YYYY' (e.g., 'Gwinnett-2019').")
         else:
+            report = dataset.quality_report()
+            with st.expander("🧪 Data Quality Report", expanded=not report.ok):
+                if report.ok:
+                    st.success(f"✅ {report.rows:,} rows passed all checks.")
+                for issue in report.issues():
+                    st.warning(f"⚠️ {issue}")
+                st.dataframe(
+                    report.columns,
+                    column_config={
+                        "null_rate": st.column_config.NumberColumn("Missing", format="percent"),
+                        "coercion_failures": st.column_config.NumberColumn("Not Numeric"),
+                        "out_of_range": st.column_config.NumberColumn("Out of Range"),
+                    },
+                )
            
-            county_list = sorted(df["county"].unique())
+            index = dataset.county_year_index()
+            county_list = index.counties
             selected_county = st.selectbox("Select a County", county_list)
 
            
-            year_list = sorted(df["year"].unique(), reverse=True)
+            year_list = index.years
             selected_year = st.selectbox("Select a Year", year_list)
 
           
-            filtered_data = df[(df["county"] == selected_county) & (df["year"] == selected_year)]
+            filtered_data = dataset.rows_for(selected_county, selected_year)
 
             if not filtered_data.empty:
                 st.markdown(f"<h3 class='custom-subheader'>📊 Data for {selected_county} in {selected_year}</h3>", unsafe_allow_html=True)
@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-import statsmodels.api as sm
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from optimedu.datasets import MissingCountyYearError, active_dataset, normalize_columns, read_county_year_csv
+from optimedu.model_store import append_rows, list_models, load_model, save_model
+from optimedu.plots import partial_regression_png
+from optimedu.regression import MissingFeatureError, SufficientStatistics, score_scenarios, statsmodels_summary
 
 
 st.set_page_config(page_title="School Budget Impact Analyzer", layout="wide")
@@ -71,20 +72,21 @@ with st.container():
 
 uploaded_file = st.file_uploader("Upload a CSV file", type=["csv"])
 
-if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file)
-
-    if "county-year" in df.columns:
-        df["county"] = df["county-year"].str.extract(r'^(.+)-\d{4}$', expand=True)
-        df["year"] = df["county-year"].str.extract(r'-(\d{4})$', expand=True)
-
-        df.dropna(subset=["county", "year"], inplace=True)
+if uploaded_file is not None or "dataset_key" in st.session_state:
+    try:
+        dataset = active_dataset(uploaded_file)
+    except MissingCountyYearError:
+        dataset = None
 
-        df["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
+    if dataset is not None:
+        df = dataset.frame
 
-        df.dropna(subset=["year"], inplace=True)
+        if uploaded_file is None:
+            st.caption("📎 Analyzing the dataset uploaded earlier in this session.")
 
-        df.drop(columns=['county-year'], inplace=True)
+        issues = dataset.quality_report().issues()
+        if issues:
+            st.warning("⚠️ Data-quality issues found in this file:\n" + "\n".join(f"- {issue}" for issue in issues))
 
         numeric_cols = [
             'spending_per_student',
@@ -100,13 +102,7 @@ if uploaded_file is not None:
         numeric_cols = [col for col in numeric_cols if col in df.columns]
 
        
-        means = df[numeric_cols].mean()
-        std_devs = df[numeric_cols].std()
-
-  
-        if numeric_cols:
-            scaler = StandardScaler()
-            df[numeric_cols] = scaler.fit_transform(df[numeric_cols])
+        means, std_devs = dataset.moments(numeric_cols)
 
  
         independent_vars = ['spending_per_student', 'student_teacher_ratio', 'per_pupil_instructional_spending']
@@ -127,42 +123,57 @@ if uploaded_file is not None:
         }
 
    
-        models = {}
+        model_effects = {
+            "Pooled OLS": (),
+            "County fixed effects": ("county",),
+            "County and year fixed effects": ("county", "year"),
+        }
+        model_type = st.selectbox("Model", list(model_effects))
+        effects = model_effects[model_type]
+        fit = dataset.ols(independent_vars, [col for col in dependent_vars if col in df.columns], effects)
+        if effects:
+            st.caption("Fixed effects are absorbed by demeaning within each group; predictions describe an average county.")
 
-        for dep_var in dependent_vars:
-            if dep_var in df.columns:
-                X = df[independent_vars]
-                y = df[dep_var]
-                X = sm.add_constant(X) 
+        show_summaries = st.toggle("Show full regression summaries", value=False)
 
-                model = sm.OLS(y, X).fit()
-                models[dep_var] = model  
+        bootstrap = None
+        if effects == ("county", "year"):
+            st.caption("Bootstrap intervals are available for pooled OLS and county fixed effects.")
+        elif st.toggle("Show 95% bootstrap intervals (resampling whole counties)", value=False):
+            bootstrap = dataset.bootstrap(independent_vars, fit.targets, effects)
+            coefficient_lower, coefficient_upper = bootstrap.coefficient_intervals()
 
+        for dep_var in dependent_vars:
+            if dep_var in df.columns:
                 st.markdown(f"### 📊 Partial Regression Plots for {label_map[dep_var]}")
-                fig, axes = plt.subplots(1, len(independent_vars), figsize=(15, 5))
-
-                for i, col in enumerate(independent_vars):
-                    x_original = df[col] * std_devs[col] + means[col]
-                    y_original = df[dep_var] * std_devs[dep_var] + means[dep_var]
-
-                    sns.regplot(
-                        x=x_original, 
-                        y=y_original, 
-                        ax=axes[i], 
-                        ci=None,
-                        scatter_kws={"alpha": 0.4, "color": "gray", "s": 80},
-                        line_kws={"color": "#2a818c", "linewidth": 2.5}
-                    )
-
-                   
-                    if i == len(independent_vars) // 2:
-                        axes[i].set_title(f'{label_map[dep_var]} vs Independent Variables', fontsize=14)
-
-                    axes[i].set_xlabel(label_map[col], fontsize=12)
-                    axes[i].set_ylabel("") 
-                    axes[i].grid(False)
-
-                st.pyplot(fig)
+                st.image(
+                    partial_regression_png(
+                        dataset,
+                        independent_vars,
+                        dep_var,
+                        [label_map[col] for col in independent_vars],
+                        label_map[dep_var],
+                    ),
+                    width="stretch",
+                )
+
+                if show_summaries and fit.nobs[dep_var] <= len(independent_vars) + 1:
+                    st.info(f"Not enough complete rows to summarize the {label_map[dep_var]} regression.")
+                elif show_summaries and effects:
+                    st.dataframe(pd.DataFrame({
+                        "coef": fit.coefficients[dep_var],
+                        "std err": fit.standard_errors[dep_var],
+                    }))
+                    st.caption(f"Within R²: {fit.r_squared[dep_var]:.3f} · Observations: {fit.nobs[dep_var]:,}")
+                elif show_summaries:
+                    st.text(statsmodels_summary(df[independent_vars], df[dep_var]).as_text())
+
+                if bootstrap is not None:
+                    st.dataframe(pd.DataFrame({
+                        "coef": fit.coefficients[dep_var],
+                        "95% lower": coefficient_lower[dep_var],
+                        "95% upper": coefficient_upper[dep_var],
+                    }))
 
         st.subheader("🎛️ Interactive Prediction Tool")
 
@@ -181,29 +192,101 @@ if uploaded_file is not None:
             )
 
    
-        user_input_df = pd.DataFrame([user_inputs])
-
-     
-        for col in independent_vars:
-            user_input_df[col] = (user_input_df[col] - means[col]) / std_devs[col]
-
-        user_input_df = sm.add_constant(user_input_df.reindex(columns=['const'] + independent_vars, fill_value=1.0))
+        predictions = fit.predict(pd.DataFrame([user_inputs])).iloc[0]
+        if bootstrap is not None:
+            prediction_lower, prediction_upper = bootstrap.prediction_intervals(pd.DataFrame([user_inputs]))
 
     
         st.subheader("📊 Predicted Outcomes")
 
         for dep_var in dependent_vars:
-            if dep_var in models:
-                try:
-                    prediction = models[dep_var].predict(user_input_df)[0]
-                    prediction_original = prediction * std_devs[dep_var] + means[dep_var]
+            if dep_var in fit.targets:
+                prediction_original = predictions[dep_var]
 
+                if np.isfinite(prediction_original):
                     st.metric(
                         label=f"{label_map[dep_var]}",
                         value=f"{prediction_original:.2f}"
                     )
-                except Exception as e:
-                    st.error(f"Error predicting {dep_var}: {str(e)}")
+                    if bootstrap is not None:
+                        st.caption(
+                            f"95% interval: {prediction_lower[dep_var].iloc[0]:.2f} – "
+                            f"{prediction_upper[dep_var].iloc[0]:.2f}"
+                        )
+                else:
+                    st.error(f"Error predicting {dep_var}: not enough complete rows to fit the model.")
+
+        st.subheader("📋 Score What-If Scenarios")
+        st.write(
+            "Upload a CSV with one candidate budget per row and the columns "
+            + ", ".join(f"`{var}`" for var in independent_vars)
+            + " to predict every outcome for all rows at once."
+        )
+
+        scenario_file = st.file_uploader("Upload scenarios", type=["csv"], key="scenario_file")
+        if scenario_file is not None:
+            scenarios = pd.read_csv(scenario_file)
+            scenarios.columns = normalize_columns(scenarios.columns)
+            try:
+                scored = score_scenarios(fit, scenarios)
+            except MissingFeatureError as e:
+                st.error(f"⚠️ {e}")
+            else:
+                st.dataframe(scored, hide_index=True)
+                st.download_button(
+                    "Download scored scenarios",
+                    scored.to_csv(index=False),
+                    file_name="scored_scenarios.csv",
+                    mime="text/csv",
+                )
+
+        st.subheader("💾 Save Model")
+        st.write("Save the pooled OLS model so next year's rows can be added without re-uploading the full history.")
+        model_name = st.text_input("Model name", value="impact-model")
+        if st.button("Save model"):
+            statistics = SufficientStatistics.from_frame(df, fit.features, fit.targets)
+            too_few = [target for target, count in zip(fit.targets, statistics.count) if count <= len(fit.features) + 1]
+            if too_few:
+                st.error(f"⚠️ Not enough complete rows to fit {', '.join(too_few)}; the model was not saved.")
+            else:
+                saved = save_model(model_name, statistics)
+                st.success(f"✅ Saved model '{saved}'.")
 
     else:
         st.error("⚠️ CSV file must contain a 'county-year' column. Please check your file format.")
+
+
+saved_models = list_models()
+if saved_models:
+    st.subheader("🗂️ Saved Models")
+    selected_model = st.selectbox("Saved model", saved_models)
+    statistics = load_model(selected_model)
+
+    new_rows_file = st.file_uploader("Append a new year's rows", type=["csv"], key="append_file")
+    if new_rows_file is not None:
+        try:
+            new_rows = read_county_year_csv(new_rows_file)
+        except MissingCountyYearError:
+            new_rows = None
+
+        if new_rows is None:
+            st.error("⚠️ CSV file must contain a 'county-year' column. Please check your file format.")
+        else:
+            missing = [col for col in statistics.features + statistics.targets if col not in new_rows.columns]
+            if missing:
+                st.error(f"⚠️ New rows are missing columns: {', '.join(missing)}.")
+            elif st.button("Append rows"):
+                statistics, skipped = append_rows(selected_model, new_rows)
+                st.success(f"✅ Appended the new rows to '{selected_model}'.")
+                if skipped:
+                    st.info(f"Years already in the model were skipped: {', '.join(map(str, skipped))}.")
+
+    saved_fit = statistics.fit()
+    st.write(
+        "Fitted on the rows from "
+        + (f"{statistics.years[0]}–{statistics.years[-1]}." if statistics.years else "an unknown range of years.")
+    )
+    coefficient_table = saved_fit.coefficients.T
+    coefficient_table["R²"] = saved_fit.r_squared
+    coefficient_table["Rows"] = saved_fit.nobs
+    st.dataframe(coefficient_table)
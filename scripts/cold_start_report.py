@@ -0,0 +1,119 @@
+"""Cold-start report for every page of the app, checked against a budget.
+
+Each page is measured in a fresh interpreter, so nothing is warm from an
+earlier page: first its top-level imports are executed and timed, then the
+page is rendered once with Streamlit's ``AppTest`` and timed. The report also
+lists which heavy modules the imports pulled in; those are meant to be
+loaded only on the code path that needs them.
+
+    python scripts/cold_start_report.py
+    python scripts/cold_start_report.py --budget-scale 2 "pages/AI-Powered Recommendations.py"
+
+Exits with status 1 when a page is over its import or render budget or
+imports a heavy module up front.
+"""
+
+import argparse
+import ast
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ["matplotlib", "seaborn", "scipy", "statsmodels", "sklearn", "openai", "yfinance"]
+
+# Seconds for the top-level imports and for the first render of each page.
+BUDGETS = {
+    "Home_Page.py": (1.0, 1.0),
+    "pages/OptimEdu Data Uploader.py": (1.5, 1.0),
+    "pages/School Budget Impact Analyzer.py": (1.5, 1.0),
+    "pages/Budget & Investment Forecaster.py": (1.5, 3.0),
+    "pages/AI-Powered Recommendations.py": (1.0, 1.0),
+}
+RENDER_TIMEOUT_SECONDS = 120
+
+
+def top_level_imports(path):
+    """Source of the imports a page runs before anything else."""
+    tree = ast.parse(Path(path).read_text(encoding="utf-8"))
+    return ast.unparse([node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))])
+
+
+def measure(page):
+    """Import and first-render times of ``page`` in this (fresh) interpreter."""
+    sys.path.insert(0, str(ROOT))
+    imports = top_level_imports(ROOT / page)
+
+    start = time.perf_counter()
+    exec(imports, {"__name__": "__cold_start__"})
+    import_seconds = time.perf_counter() - start
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(ROOT / page), default_timeout=RENDER_TIMEOUT_SECONDS)
+    start = time.perf_counter()
+    app.run()
+    render_seconds = time.perf_counter() - start
+
+    return {
+        "import_seconds": import_seconds,
+        "render_seconds": render_seconds,
+        "heavy_imports": loaded,
+        "exceptions": [exception.message for exception in app.exception],
+    }
+
+
+def measure_in_subprocess(page):
+    result = subprocess.run(
+        [sys.executable, __file__, "--measure", page],
+        cwd=ROOT, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Measuring {page} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", default=list(BUDGETS), help="pages to measure (default: all)")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every budget, e.g. on a slow machine")
+    parser.add_argument("--measure", metavar="PAGE", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    if options.measure:
+        print(json.dumps(measure(options.measure)))
+        return 0
+
+    failures = 0
+    print(f"{'page':<42} {'import':>14} {'first render':>16}   heavy imports")
+    for page in options.pages:
+        import_budget, render_budget = (options.budget_scale * budget for budget in BUDGETS.get(page, (1.0, 1.0)))
+        report = measure_in_subprocess(page)
+        problems = []
+        if report["import_seconds"] > import_budget:
+            problems.append(f"imports over {import_budget:.1f} s budget")
+        if report["render_seconds"] > render_budget:
+            problems.append(f"first render over {render_budget:.1f} s budget")
+        if report["heavy_imports"]:
+            problems.append("heavy modules imported up front")
+        problems.extend(f"exception: {message}" for message in report["exceptions"])
+        failures += bool(problems)
+
+        print(f"{page:<42} {report['import_seconds']:6.2f} / {import_budget:4.1f} s"
+              f" {report['render_seconds']:8.2f} / {render_budget:4.1f} s"
+              f"   {', '.join(report['heavy_imports']) or '-'}")
+        for problem in problems:
+            print(f"{'':<4}FAIL {problem}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
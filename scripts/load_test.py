@@ -0,0 +1,110 @@
+"""Latency and throughput benchmark for the recommendations page's LLM path.
+
+Runs N concurrent simulated sessions, each sending a series of
+recommendation prompts through the same client, retry, concurrency-limit
+and caching code the page uses (:mod:`optimedu.llm`), and reports
+time-to-first-token and total latency percentiles plus throughput.
+
+    python scripts/mock_llm_server.py --port 8001 &
+    python scripts/load_test.py --base-url http://127.0.0.1:8001/v1 --sessions 32 --requests 10
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from optimedu.llm import CompletionStream, ResponseCache, make_client  # noqa: E402
+
+METRICS = ["Spending Per Student", "Student-Teacher Ratio", "Per-Pupil Instructional Spending"]
+CHANGES = ["Increase", "Decrease"]
+
+
+class NoCache:
+    """Response cache stand-in that never hits."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+
+def prompts(session, unique):
+    for index, (metric, change) in enumerate(itertools.cycle(itertools.product(METRICS, CHANGES))):
+        prompt = (f"A school wants to {change.lower()} its {metric.lower()}. Provide specific recommendations "
+                  "on how they can achieve this goal while maintaining educational quality.")
+        yield prompt + (f" (session {session}, request {index})" if unique else "")
+
+
+def run_session(session, client, cache, options):
+    results = []
+    for prompt in itertools.islice(prompts(session, options.unique_prompts), options.requests):
+        start = time.perf_counter()
+        first_token = None
+        try:
+            stream = CompletionStream(client, options.model, [{"role": "system", "content": prompt}], cache)
+            for _ in stream:
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+            results.append((first_token, time.perf_counter() - start, None))
+        except Exception as error:
+            results.append((None, time.perf_counter() - start, type(error).__name__))
+    return results
+
+
+def percentile_row(name, values):
+    if not len(values):
+        return f"{name:<16} (no samples)"
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+    return f"{name:<16} p50 {p50:8.1f} ms   p95 {p95:8.1f} ms   p99 {p99:8.1f} ms"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=os.environ.get("OPENAI_BASE_URL", "http://127.0.0.1:8001/v1"))
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY", "mock"))
+    parser.add_argument("--model", default="gpt-4")
+    parser.add_argument("--sessions", type=int, default=16, help="concurrent simulated sessions")
+    parser.add_argument("--requests", type=int, default=6, help="requests per session")
+    parser.add_argument("--cache", action="store_true", help="use a fresh two-tier response cache")
+    parser.add_argument("--unique-prompts", action="store_true", help="make every prompt distinct")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    client = make_client(options.api_key, base_url=options.base_url)
+    if options.cache:
+        cache = ResponseCache(path=Path(tempfile.mkdtemp(prefix="optimedu-load-")) / "responses.sqlite3")
+    else:
+        cache = NoCache()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=options.sessions) as executor:
+        sessions = executor.map(lambda session: run_session(session, client, cache, options), range(options.sessions))
+        results = [result for session in sessions for result in session]
+    elapsed = time.perf_counter() - start
+
+    completed = [result for result in results if result[2] is None]
+    errors = [result[2] for result in results if result[2] is not None]
+    print(f"{options.sessions} sessions x {options.requests} requests against {options.base_url}"
+          f" ({'cached' if options.cache else 'uncached'})")
+    print(percentile_row("time to first", np.array([result[0] for result in completed if result[0] is not None])))
+    print(percentile_row("total latency", np.array([result[1] for result in completed])))
+    print(f"{'throughput':<16} {len(completed) / elapsed:8.1f} completions/s over {elapsed:.1f} s")
+    if errors:
+        print(f"{'errors':<16} {len(errors)} ({', '.join(sorted(set(errors)))})")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())